@@ -0,0 +1,497 @@
+# batchPacman.py
+# --------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+BatchGames plays many independent games of classic Pacman in lock step,
+one ply (one agent's move) at a time, with the state of every game kept in
+numpy arrays.  It plays by the rules of ClassicGameRules in pacman.py, with
+RandomGhost and DirectionalGhost ghosts, and a Pacman policy that picks the
+moves of the whole batch at once.
+
+Every game has its own random.Random, seeded like runGames seeds its games
+when given workers, so that game i of a batch plays out exactly like the
+game with seed pacman.getGameSeeds(seed, numGames)[i] in pacman.py:
+
+> python batchPacman.py -l mediumClassic -g DirectionalGhost -n 500
+> python batchPacman.py -p greedyPolicy -n 100 --compare
+"""
+
+from game import Directions
+from game import Actions
+import ghostAgents
+import pacman
+import util
+import random
+import sys
+import time
+
+try:
+    import numpy
+    _NUMPY_ENABLED = True
+except ImportError:
+    _NUMPY_ENABLED = False
+
+# Actions are indices into DIRECTIONS; the first four are the moves
+DIRECTIONS = [Directions.NORTH, Directions.SOUTH,
+              Directions.EAST, Directions.WEST, Directions.STOP]
+NORTH, SOUTH, EAST, WEST, STOP = list(range(5))
+DX = [0, 0, 1, -1, 0]
+DY = [1, -1, 0, 0, 0]
+REVERSE = [SOUTH, NORTH, WEST, EAST, STOP]
+LEFT = [DIRECTIONS.index(Directions.LEFT[d]) for d in DIRECTIONS]
+RIGHT = [DIRECTIONS.index(Directions.RIGHT[d]) for d in DIRECTIONS]
+
+# The order getPossibleActions lists legal actions in, and the order
+# util.sample walks a distribution in
+LEGAL_ORDER = [DIRECTIONS.index(d) for d, vector in Actions._directionsAsList]
+SAMPLE_ORDER = sorted(range(4), key=lambda d: DIRECTIONS[d])
+
+
+def directionalDistribution(legal, best, bestProb):
+    """
+    Builds the distribution DirectionalGhost.getDistribution returns for
+    the legal actions and the best of them.
+    """
+    dist = util.Counter()
+    for a in best:
+        dist[a] = bestProb / len(best)
+    for a in legal:
+        dist[a] += (1-bestProb) / len(legal)
+    dist.normalize()
+    return dist
+
+
+def randomDistribution(legal):
+    "Builds the distribution RandomGhost.getDistribution returns"
+    dist = util.Counter()
+    for a in legal:
+        dist[a] = 1.0
+    dist.normalize()
+    return dist
+
+
+def sampleThresholds(dist):
+    """
+    Returns the running totals util.sample compares its random number with,
+    one per action of the distribution in SAMPLE_ORDER, padded to four with
+    infinity.
+    """
+    items = sorted(dist.items())
+    distribution = [v for k, v in items]
+    if sum(distribution) != 1:
+        distribution = util.normalize(distribution)
+    thresholds = [distribution[0]]
+    for value in distribution[1:]:
+        thresholds.append(thresholds[-1] + value)
+    return thresholds + [float('inf')] * (4 - len(thresholds))
+
+
+def ghostThresholds(ghost, scared):
+    """
+    Returns a (16, 16, 4) array of sample thresholds for a ghost, indexed by
+    the bitmask of its legal moves, the bitmask of the best of them (for a
+    DirectionalGhost) and the position of the move among the legal moves
+    in SAMPLE_ORDER.
+    """
+    table = numpy.full((16, 16, 4), numpy.inf)
+    for legalMask in range(1, 16):
+        legal = [DIRECTIONS[d]
+                 for d in LEGAL_ORDER if d < 4 and legalMask >> d & 1]
+        for bestMask in range(16):
+            if bestMask & ~legalMask:
+                continue
+            if isinstance(ghost, ghostAgents.DirectionalGhost):
+                if bestMask == 0:
+                    continue
+                best = [a for a in legal if bestMask >> DIRECTIONS.index(a) & 1]
+                prob = ghost.prob_scaredFlee if scared else ghost.prob_attack
+                dist = directionalDistribution(legal, best, prob)
+            else:
+                dist = randomDistribution(legal)
+            table[legalMask, bestMask] = sampleThresholds(dist)
+    return table
+
+
+# The legal moves of each legal move bitmask, in SAMPLE_ORDER
+SAMPLE_MOVES = [([d for d in SAMPLE_ORDER if legalMask >> d & 1] + [STOP] * 4)[:4]
+                for legalMask in range(16)]
+
+
+class BatchGames:
+    """
+    numGames games of classic Pacman on one layout, against the same ghost
+    agents, advanced together one ply at a time.
+
+    Positions are kept doubled (x2, y2) so that the half steps of scared
+    ghosts stay integers.  Food is a bitboard of uint64 words per game over
+    the food cells of the layout.
+    """
+
+    def __init__(self, layout, ghosts, numGames, seed=None, seeds=None):
+        if not _NUMPY_ENABLED:
+            raise Exception('BatchGames requires numpy')
+        for ghost in ghosts:
+            if not isinstance(ghost, (ghostAgents.RandomGhost, ghostAgents.DirectionalGhost)):
+                raise Exception(
+                    'BatchGames only plays RandomGhost and DirectionalGhost ghosts')
+        if seeds == None:
+            seeds = pacman.getGameSeeds(seed, numGames)
+        self.layout = layout
+        self.numGames = numGames
+        self.random = [random.Random(s) for s in seeds]
+        self.width, self.height = layout.width, layout.height
+
+        # The agents of the game, as GameStateData.initialize picks them
+        positions = []
+        for isPacman, pos in layout.agentPositions:
+            if not isPacman and len(positions) - 1 == len(ghosts):
+                continue
+            positions.append(pos)
+        self.numAgents = len(positions)
+        self.ghosts = ghosts[:self.numAgents - 1]
+        self.startX2 = numpy.array([2 * x for x, y in positions])
+        self.startY2 = numpy.array([2 * y for x, y in positions])
+
+        # Per cell (x * height + y) tables of the layout
+        cells = self.width * self.height
+        table = layout.getMoveTable()
+        self.moves = numpy.zeros(cells, dtype=numpy.int64)
+        for (x, y), actions in table.actions.items():
+            for action in actions:
+                self.moves[x * self.height + y] |= 1 << DIRECTIONS.index(action)
+        foodCells = layout.food.asList()
+        self.foodBit = numpy.full(cells, -1, dtype=numpy.int64)
+        for i, (x, y) in enumerate(foodCells):
+            self.foodBit[x * self.height + y] = i
+        self.capsuleIndex = numpy.full(cells, -1, dtype=numpy.int64)
+        for i, (x, y) in enumerate(layout.capsules):
+            self.capsuleIndex[x * self.height + y] = i
+        self.thresholds = [(ghostThresholds(g, False), ghostThresholds(g, True))
+                           for g in self.ghosts]
+        self.sampleMoves = numpy.array(SAMPLE_MOVES)
+
+        # The state of every game
+        n = numGames
+        self.x2 = numpy.tile(self.startX2, (n, 1))
+        self.y2 = numpy.tile(self.startY2, (n, 1))
+        self.direction = numpy.full((n, self.numAgents), STOP, dtype=numpy.int64)
+        self.scaredTimer = numpy.zeros((n, self.numAgents), dtype=numpy.int64)
+        words = (len(foodCells) + 63) // 64
+        self.food = numpy.zeros((n, max(words, 1)), dtype=numpy.uint64)
+        for i in range(len(foodCells)):
+            self.food[:, i // 64] |= numpy.uint64(1 << (i % 64))
+        self.numFood = numpy.full(n, len(foodCells), dtype=numpy.int64)
+        self.capsules = numpy.ones((n, len(layout.capsules)), dtype=bool)
+        self.score = numpy.zeros(n, dtype=numpy.int64)
+        self.win = numpy.zeros(n, dtype=bool)
+        self.lose = numpy.zeros(n, dtype=bool)
+        self.numMoves = numpy.zeros(n, dtype=numpy.int64)
+        self.agentIndex = 0
+
+    #################################################
+    # Accessors for Pacman policies, over the batch #
+    #################################################
+
+    def isActive(self):
+        "Returns which games are still being played"
+        return ~(self.win | self.lose)
+
+    def getPacmanCell(self):
+        return self.x2[:, 0] // 2 * self.height + self.y2[:, 0] // 2
+
+    def getLegalPacmanActions(self):
+        """
+        Returns a (numGames, 5) boolean array of Pacman's legal actions,
+        indexed like DIRECTIONS.
+        """
+        legal = self.moves[self.getPacmanCell()]
+        return (legal[:, None] >> numpy.arange(5)) & 1 == 1
+
+    def hasFood(self, cells):
+        "Returns, for each game, whether there is food in the given cell"
+        bits = self.foodBit[cells]
+        words = self.food[numpy.arange(self.numGames), numpy.maximum(bits, 0) // 64]
+        shifts = (numpy.maximum(bits, 0) % 64).astype(numpy.uint64)
+        return (bits >= 0) & ((words >> shifts) & numpy.uint64(1) == 1)
+
+    def getSuccessorScores(self):
+        """
+        Returns a (numGames, 5) array of the score after each of Pacman's
+        actions, and -inf for illegal actions, as
+        GameState.generatePacmanSuccessor would score them.
+        """
+        legal = self.getLegalPacmanActions()
+        scores = numpy.full((self.numGames, 5), -numpy.inf)
+        x2, y2 = self.x2[:, 0], self.y2[:, 0]
+        for d in range(5):
+            nx2, ny2 = x2 + 2 * DX[d], y2 + 2 * DY[d]
+            cells = nx2 // 2 * self.height + ny2 // 2
+            cells = numpy.where(legal[:, d], cells, self.getPacmanCell())
+            change = numpy.full(self.numGames, -pacman.TIME_PENALTY, dtype=numpy.int64)
+            food = self.hasFood(cells)
+            win = food & (self.numFood == 1)
+            change += 10 * food + 500 * win
+            scared = self.scaredTimer.copy()
+            capsule = self.capsuleIndex[cells]
+            eaten = capsule >= 0
+            eaten[eaten] = self.capsules[eaten, capsule[eaten]]
+            scared[eaten, 1:] = pacman.SCARED_TIME
+            for ghost in range(1, self.numAgents):
+                caught = numpy.abs(self.x2[:, ghost] - nx2) + \
+                    numpy.abs(self.y2[:, ghost] - ny2) <= 1
+                change += 200 * (caught & (scared[:, ghost] > 0))
+                change -= 500 * (caught & (scared[:, ghost] == 0) & ~win)
+            scores[:, d] = numpy.where(legal[:, d], self.score + change, -numpy.inf)
+        return scores
+
+    #####################
+    # Playing the games #
+    #####################
+
+    def step(self, policy):
+        """
+        Plays one ply in every game still being played: Pacman's move, from
+        policy(self), or the move of the ghost whose turn it is.
+        """
+        active = self.isActive()
+        if self.agentIndex == 0:
+            actions = numpy.asarray(policy(self), dtype=numpy.int64)
+            self.movePacman(active, actions)
+        else:
+            self.moveGhost(active, self.agentIndex)
+        self.numMoves += active
+        self.agentIndex = (self.agentIndex + 1) % self.numAgents
+
+    def run(self, policy, maxMoves=None):
+        """
+        Plays every game to the end, or until maxMoves agent moves, and
+        returns the scores.
+        """
+        while self.isActive().any():
+            if maxMoves != None and self.numMoves.max() >= maxMoves:
+                break
+            self.step(policy)
+        return self.score
+
+    def movePacman(self, active, actions):
+        legal = self.getLegalPacmanActions()
+        games = numpy.nonzero(active)[0]
+        actions = actions[games]
+        if not legal[games, actions].all():
+            raise Exception("Illegal action " + str(
+                DIRECTIONS[actions[~legal[games, actions]][0]]))
+        self.x2[games, 0] += 2 * numpy.take(DX, actions)
+        self.y2[games, 0] += 2 * numpy.take(DY, actions)
+        moved = actions != STOP
+        self.direction[games[moved], 0] = actions[moved]
+        change = numpy.zeros(self.numGames, dtype=numpy.int64)
+
+        # Eat food and capsules
+        cells = self.getPacmanCell()
+        food = active & self.hasFood(cells)
+        eating = numpy.nonzero(food)[0]
+        bits = self.foodBit[cells[eating]]
+        self.food[eating, bits // 64] &= ~(numpy.uint64(1) << (bits % 64).astype(numpy.uint64))
+        self.numFood[eating] -= 1
+        change[food] += 10
+        won = food & (self.numFood == 0) & ~self.lose
+        change[won] += 500
+        self.win |= won
+        capsule = self.capsuleIndex[cells]
+        eaten = active & (capsule >= 0)
+        eaten[eaten] = self.capsules[eaten, capsule[eaten]]
+        self.capsules[eaten, capsule[eaten]] = False
+        self.scaredTimer[eaten, 1:] = pacman.SCARED_TIME
+
+        change[active] -= pacman.TIME_PENALTY
+        for ghost in range(1, self.numAgents):
+            self.checkDeath(active, ghost, change)
+        self.score += change
+
+    def moveGhost(self, active, ghost):
+        x2, y2 = self.x2[:, ghost], self.y2[:, ghost]
+        direction = self.direction[:, ghost]
+        scared = self.scaredTimer[:, ghost] > 0
+
+        # Legal moves: ghosts between grid points keep going, and ghosts
+        # on them neither stop nor turn around unless they must
+        onPoint = (x2 % 2 == 0) & (y2 % 2 == 0)
+        cells = x2 // 2 * self.height + y2 // 2
+        legal = numpy.where(onPoint, self.moves[numpy.where(onPoint, cells, 0)] & 15,
+                            1 << numpy.minimum(direction, 3))
+        reverse = 1 << numpy.take(REVERSE, direction)
+        turnable = (direction != STOP) & (legal & ~reverse != 0)
+        legal = numpy.where(turnable, legal & ~reverse, legal)
+        if (active & (legal == 0)).any():
+            raise Exception("Illegal ghost action " + Directions.STOP)
+
+        # The best moves of a DirectionalGhost
+        best = numpy.zeros(self.numGames, dtype=numpy.int64)
+        if isinstance(self.ghosts[ghost - 1], ghostAgents.DirectionalGhost):
+            speed = numpy.where(scared, 1, 2)
+            distances = numpy.empty((self.numGames, 4), dtype=numpy.int64)
+            for d in range(4):
+                distances[:, d] = numpy.abs(x2 + DX[d] * speed - self.x2[:, 0]) + \
+                    numpy.abs(y2 + DY[d] * speed - self.y2[:, 0])
+            isLegal = (legal[:, None] >> numpy.arange(4)) & 1 == 1
+            bestDistance = numpy.where(scared,
+                                       numpy.where(isLegal, distances, -1).max(1),
+                                       numpy.where(isLegal, distances, 1 << 30).min(1))
+            isBest = isLegal & (distances == bestDistance[:, None])
+            best = (isBest << numpy.arange(4)).sum(1)
+
+        # Sample the move as util.sample would, with each game's generator
+        games = numpy.nonzero(active)[0]
+        choice = numpy.array([self.random[g].random() for g in games])
+        notScared, isScared = self.thresholds[ghost - 1]
+        thresholds = numpy.where(scared[games, None], isScared[legal[games], best[games]],
+                                 notScared[legal[games], best[games]])
+        slots = numpy.minimum((choice[:, None] > thresholds).sum(1), 3)
+        picked = self.sampleMoves[legal[games], slots]
+
+        speed = numpy.where(scared[games], 1, 2)
+        self.x2[games, ghost] += numpy.take(DX, picked) * speed
+        self.y2[games, ghost] += numpy.take(DY, picked) * speed
+        self.direction[games, ghost] = picked
+
+        # Time passes: the last scared move snaps the ghost to the grid
+        timer = self.scaredTimer[:, ghost]
+        snap = active & (timer == 1)
+        self.x2[snap, ghost] = (self.x2[snap, ghost] + 1) // 2 * 2
+        self.y2[snap, ghost] = (self.y2[snap, ghost] + 1) // 2 * 2
+        timer[active] = numpy.maximum(0, timer[active] - 1)
+
+        change = numpy.zeros(self.numGames, dtype=numpy.int64)
+        self.checkDeath(active, ghost, change)
+        self.score += change
+
+    def checkDeath(self, active, ghost, change):
+        """
+        Resolves a collision of Pacman and a ghost, as GhostRules.collide
+        does: scared ghosts are eaten and go home, others kill Pacman.
+        """
+        caught = active & (numpy.abs(self.x2[:, ghost] - self.x2[:, 0]) +
+                           numpy.abs(self.y2[:, ghost] - self.y2[:, 0]) <= 1)
+        eaten = caught & (self.scaredTimer[:, ghost] > 0)
+        change[eaten] += 200
+        self.x2[eaten, ghost] = self.startX2[ghost]
+        self.y2[eaten, ghost] = self.startY2[ghost]
+        self.direction[eaten, ghost] = STOP
+        self.scaredTimer[eaten, ghost] = 0
+        killed = caught & ~eaten & ~self.win
+        change[killed] -= 500
+        self.lose |= killed
+
+###################
+# Pacman policies #
+###################
+
+
+def leftTurnPolicy(games):
+    "LeftTurnAgent, for a batch of games"
+    legal = games.getLegalPacmanActions()
+    rows = numpy.arange(games.numGames)
+    current = games.direction[:, 0]
+    current = numpy.where(current == STOP, NORTH, current)
+    actions = numpy.full(games.numGames, STOP)
+    left = numpy.take(LEFT, current)
+    for candidate in reversed([left, current, numpy.take(RIGHT, current),
+                               numpy.take(LEFT, left)]):
+        actions = numpy.where(legal[rows, candidate], candidate, actions)
+    return actions
+
+
+def greedyPolicy(games):
+    """
+    GreedyAgent with scoreEvaluation, for a batch of games.  It breaks ties
+    with each game's generator, as GreedyAgent does with random.choice.
+    """
+    scores = games.getSuccessorScores()
+    scores[:, STOP] = -numpy.inf
+    bestScores = scores.max(1)
+    actions = numpy.full(games.numGames, STOP)
+    for g in numpy.nonzero(games.isActive())[0]:
+        best = [d for d in LEGAL_ORDER if scores[g, d] == bestScores[g]]
+        actions[g] = games.random[g].choice(best)
+    return actions
+
+
+POLICIES = {'leftTurnPolicy': (leftTurnPolicy, 'LeftTurnAgent'),
+            'greedyPolicy': (greedyPolicy, 'GreedyAgent')}
+
+
+def compareWithEngine(layout, ghosts, policyName, numGames, seed):
+    """
+    Plays the games of a batch one by one with pacman.py, and returns the
+    (score, win, moves) of each.
+    """
+    import pacmanAgents
+    import textDisplay
+    agent = getattr(pacmanAgents, POLICIES[policyName][1])()
+    outcomes = []
+    for gameSeed in pacman.getGameSeeds(seed, numGames):
+        game = pacman.playGame(pacman.ClassicGameRules(), layout, agent, ghosts,
+                               textDisplay.NullGraphics(), True, False, gameSeed)
+        outcomes.append((game.state.getScore(), game.state.isWin(),
+                         len(game.moveHistory)))
+    return outcomes
+
+
+def readCommand(argv):
+    from optparse import OptionParser
+    import layout
+    parser = OptionParser(__doc__)
+    parser.add_option('-l', '--layout', dest='layout', default='mediumClassic',
+                      help='the layout to play on [Default: %default]')
+    parser.add_option('-g', '--ghosts', dest='ghost', default='RandomGhost',
+                      help='RandomGhost or DirectionalGhost [Default: %default]')
+    parser.add_option('-k', '--numghosts', type='int', dest='numGhosts', default=4,
+                      help='the maximum number of ghosts [Default: %default]')
+    parser.add_option('-p', '--policy', dest='policy', default='leftTurnPolicy',
+                      help='the Pacman policy: ' + ', '.join(sorted(POLICIES)) + ' [Default: %default]')
+    parser.add_option('-n', '--numGames', dest='numGames', type='int', default=100,
+                      help='the number of games to play [Default: %default]')
+    parser.add_option('-s', '--seed', dest='seed', type='int', default=0,
+                      help='the master seed of the games [Default: %default]')
+    parser.add_option('--compare', action='store_true', dest='compare', default=False,
+                      help='also play the games with pacman.py and check the outcomes agree')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    options.layout = layout.getLayout(options.layout)
+    ghostType = getattr(ghostAgents, options.ghost)
+    options.ghosts = [ghostType(i + 1) for i in range(options.numGhosts)]
+    return options
+
+
+if __name__ == '__main__':
+    options = readCommand(sys.argv[1:])
+    start = time.time()
+    games = BatchGames(options.layout, options.ghosts, options.numGames, options.seed)
+    scores = games.run(POLICIES[options.policy][0])
+    elapsed = time.time() - start
+    print('Average Score:', scores.mean())
+    print('Win Rate:      %d/%d (%.2f)' % (games.win.sum(), options.numGames, games.win.mean()))
+    print('Played %d games (%d moves) in %.2f s' % (options.numGames, games.numMoves.sum(), elapsed))
+    if options.compare:
+        start = time.time()
+        outcomes = compareWithEngine(options.layout, options.ghosts, options.policy,
+                                     options.numGames, options.seed)
+        elapsed = time.time() - start
+        batch = list(zip(scores.tolist(), games.win.tolist(), games.numMoves.tolist()))
+        differ = [i for i in range(options.numGames) if outcomes[i] != batch[i]]
+        print('pacman.py played them in %.2f s; %d of %d games differ' %
+              (elapsed, len(differ), options.numGames))
+        for i in differ[:5]:
+            print('  game %d: pacman.py %s, batch %s' % (i, outcomes[i], batch[i]))
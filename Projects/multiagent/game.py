@@ -24,6 +24,8 @@ from util import *
 import time
 import os
 import traceback
+import struct
+import hashlib
 import sys
 
 #######################
@@ -37,7 +39,15 @@ class Agent:
     following methods which will be called if they exist:
 
     def registerInitialState(self, state): # inspects the starting state
+    def setTimeLimits(self, moveTime, totalTime): # gets the seconds it has
+
+    Agents are handed read-only views of the game state, which share their
+    food, capsules, agent states and layout with the game.  An agent that
+    changes the states it is given must set mutableState to True, and it
+    then gets a private deep copy on every call instead.
     """
+    mutableState = False
+
 
     def __init__(self, index=0):
         self.index = index
@@ -169,6 +179,17 @@ class AgentState:
         return self.configuration.getDirection()
 
 
+# packBits header: magic, format version, flags, width, height
+GRID_MAGIC = b'PG'
+GRID_FORMAT_VERSION = 2
+GRID_HEADER = struct.Struct('<2sBBII')
+GRID_BITBOARD = 1  # flag: the packed grid was a BitGrid
+
+# Byte-level helpers for Grid.asBits and Grid._setBits
+CELL_DIGITS = bytes.maketrans(bytes(range(256)), b'0' + b'1' * 255)
+BYTE_CELLS = [[bool(byte >> bit & 1) for bit in range(8)] for byte in range(256)]
+
+
 class Grid:
     """
     A 2-dimensional array of objects backed by a list of lists.  Data is accessed
@@ -177,6 +198,7 @@ class Grid:
 
     The __str__ method constructs an output that is oriented like a pacman board.
     """
+    PACK_FLAGS = 0
 
     def __init__(self, width, height, initialValue=False, bitRepresentation=None):
         if initialValue not in [False, True]:
@@ -185,8 +207,7 @@ class Grid:
 
         self.width = width
         self.height = height
-        self.data = [[initialValue for y in range(
-            height)] for x in range(width)]
+        self.data = [[initialValue] * height for x in range(width)]
         if bitRepresentation:
             self._unpackBits(bitRepresentation)
 
@@ -209,14 +230,13 @@ class Grid:
 
     def __hash__(self):
         # return hash(str(self))
-        base = 1
-        h = 0
-        for l in self.data:
-            for i in l:
-                if i:
-                    h += base
-                base *= 2
-        return hash(h)
+        return hash(self.asBits())
+
+    def __getstate__(self):
+        # A cached MoveTable (see Actions.getMoveTable) is rebuilt on demand
+        state = self.__dict__.copy()
+        state.pop('_moveTable', None)
+        return state
 
     def copy(self):
         g = Grid(self.width, self.height)
@@ -234,6 +254,16 @@ class Grid:
     def count(self, item=True):
         return sum([x.count(item) for x in self.data])
 
+    def asBits(self):
+        """
+        Returns the cells as one int, with cell (x,y) at bit x * height + y
+        """
+        try:
+            cells = b''.join(map(bytes, self.data))
+        except (TypeError, ValueError):
+            cells = bytes([bool(cell) for column in self.data for cell in column])
+        return int(cells.translate(CELL_DIGITS)[::-1], 2) if cells else 0
+
     def asList(self, key=True):
         list = []
         for x in range(self.width):
@@ -244,56 +274,199 @@ class Grid:
 
     def packBits(self):
         """
-        Returns an efficient int list representation
+        Returns an efficient bytes representation of a boolean grid: a header
+        (GRID_MAGIC, GRID_FORMAT_VERSION, flags, width, height) followed by
+        the cells as little-endian bits, cell (x,y) at bit x * height + y.
 
-        (width, height, bitPackedInts...)
+        reconstituteGrid reads it back, as well as the older int tuple
+        representation (width, height, bitPackedInts...).
         """
-        bits = [self.width, self.height]
-        currentInt = 0
-        for i in range(self.height * self.width):
-            bit = self.CELLS_PER_INT - (i % self.CELLS_PER_INT) - 1
-            x, y = self._cellIndexToPosition(i)
-            if self[x][y]:
-                currentInt += 2 ** bit
-            if (i + 1) % self.CELLS_PER_INT == 0:
-                bits.append(currentInt)
-                currentInt = 0
-        bits.append(currentInt)
-        return tuple(bits)
+        size = (self.width * self.height + 7) // 8
+        header = GRID_HEADER.pack(GRID_MAGIC, GRID_FORMAT_VERSION,
+                                  self.PACK_FLAGS, self.width, self.height)
+        return header + self.asBits().to_bytes(size, 'little')
 
-    def _cellIndexToPosition(self, index):
-        x = index / self.height
-        y = index % self.height
-        return x, y
+    def unpackBits(packed):
+        """
+        Returns the Grid (or BitGrid) whose packBits() gave packed
+        """
+        magic, version, flags, width, height = GRID_HEADER.unpack_from(packed)
+        if magic != GRID_MAGIC or version != GRID_FORMAT_VERSION:
+            raise ValueError('unknown grid format')
+        grid = (BitGrid if flags & GRID_BITBOARD else Grid)(width, height)
+        grid._setBits(int.from_bytes(packed[GRID_HEADER.size:], 'little'))
+        return grid
+    unpackBits = staticmethod(unpackBits)
+
+    def _setBits(self, bits):
+        """
+        Fills in data from the int returned by asBits
+        """
+        cells = []
+        for byte in bits.to_bytes((self.width * self.height + 7) // 8, 'little'):
+            cells.extend(BYTE_CELLS[byte])
+        height = self.height
+        self.data = [cells[x * height:(x + 1) * height] for x in range(self.width)]
 
     def _unpackBits(self, bits):
         """
-        Fills in data from a bit-level representation
-        """
-        cell = 0
-        for packed in bits:
-            for bit in self._unpackInt(packed, self.CELLS_PER_INT):
-                if cell == self.width * self.height:
-                    break
-                x, y = self._cellIndexToPosition(cell)
-                self[x][y] = bit
-                cell += 1
-
-    def _unpackInt(self, packed, size):
-        bools = []
-        if packed < 0:
-            raise ValueError("must be a positive integer")
-        for i in range(size):
-            n = 2 ** (self.CELLS_PER_INT - i - 1)
-            if packed >= n:
-                bools.append(True)
-                packed -= n
-            else:
-                bools.append(False)
-        return bools
+        Fills in data from the int tuple representation, where each int
+        holds CELLS_PER_INT cells, first cell in the highest bit
+        """
+        packed = 0
+        for chunk in bits:
+            if chunk < 0:
+                raise ValueError("must be a positive integer")
+            packed = packed << self.CELLS_PER_INT | chunk
+        # As a binary string, the chunks list the cells in order
+        cells = format(packed, 'b').zfill(len(bits) * self.CELLS_PER_INT)
+        cells = cells[:self.width * self.height]
+        self._setBits(int(cells[::-1], 2) if cells else 0)
+
+
+class BitGrid(Grid):
+    """
+    A boolean Grid backed by a single integer bitboard, where cell (x,y) is
+    bit x * height + y.  Data is still accessed via grid[x][y], through a
+    light column view, but hashing, equality, copies, count() and asList()
+    work on the whole int at once instead of cell by cell.
+
+    Layouts use it for food, which every GameState copies, hashes and
+    compares.  Walls stay in a list-backed Grid, which is faster to read.
+    """
+    PACK_FLAGS = GRID_BITBOARD
+
+    def __init__(self, width, height, initialValue=False, bitRepresentation=None):
+        if initialValue not in [False, True]:
+            raise Exception('Grids can only contain booleans')
+        self.CELLS_PER_INT = 30
+
+        self.width = width
+        self.height = height
+        self.bits = (1 << width * height) - 1 if initialValue else 0
+        if bitRepresentation:
+            self._unpackBits(bitRepresentation)
+
+    def fromGrid(grid):
+        "Returns a BitGrid holding the same values as a boolean Grid"
+        bitGrid = BitGrid(grid.width, grid.height)
+        bitGrid.bits = grid.asBits()
+        return bitGrid
+    fromGrid = staticmethod(fromGrid)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.width
+        if not 0 <= i < self.width:
+            raise IndexError('grid index out of range')
+        return BitGridColumn(self, i * self.height)
+
+    def __setitem__(self, key, item):
+        column = self[key]
+        for y in range(self.height):
+            column[y] = item[y]
+
+    def getData(self):
+        return [[bool(self.bits >> (x * self.height + y) & 1) for y in range(self.height)]
+                for x in range(self.width)]
+
+    # A list-of-lists snapshot, for code written against Grid.data
+    data = property(getData)
+
+    def __eq__(self, other):
+        if other == None:
+            return False
+        if isinstance(other, BitGrid):
+            return self.width == other.width and self.height == other.height and self.bits == other.bits
+        return self.data == other.data
+
+    def __hash__(self):
+        # Same value as Grid.__hash__ for the same cells
+        return hash(self.bits)
+
+    def __getstate__(self):
+        return (self.width, self.height, self.bits)
+
+    def __setstate__(self, state):
+        self.width, self.height, self.bits = state
+        self.CELLS_PER_INT = 30
+
+    def copy(self):
+        g = BitGrid(self.width, self.height)
+        g.bits = self.bits
+        return g
+
+    def deepCopy(self):
+        return self.copy()
+
+    def shallowCopy(self):
+        # An int cannot be shared for writing, so this is a (cheap) copy.
+        return self.copy()
+
+    def count(self, item=True):
+        total = bin(self.bits).count('1')
+        if item:
+            return total
+        return self.width * self.height - total
+
+    def asBits(self):
+        return self.bits
+
+    def _setBits(self, bits):
+        self.bits = bits & ((1 << self.width * self.height) - 1)
+
+    def asList(self, key=True):
+        bits = self.bits
+        if not key:
+            bits = ~bits & ((1 << self.width * self.height) - 1)
+        # Scan the binary string, lowest bit first, in C rather than bit by bit
+        cells = bin(bits)[:1:-1]
+        height = self.height
+        list = []
+        i = cells.find('1')
+        while i >= 0:
+            list.append((i // height, i % height))
+            i = cells.find('1', i + 1)
+        return list
+
+
+class BitGridColumn:
+    """
+    Column x of a BitGrid, so that grid[x][y] reads and writes single bits.
+    """
+    __slots__ = ('grid', 'offset')
+
+    def __init__(self, grid, offset):
+        self.grid = grid
+        self.offset = offset
+
+    def __getitem__(self, y):
+        if y < 0:
+            y += self.grid.height
+        if not 0 <= y < self.grid.height:
+            raise IndexError('grid index out of range')
+        return bool(self.grid.bits >> (self.offset + y) & 1)
+
+    def __setitem__(self, y, value):
+        if y < 0:
+            y += self.grid.height
+        if not 0 <= y < self.grid.height:
+            raise IndexError('grid index out of range')
+        if value not in [False, True]:
+            raise Exception('Grids can only contain booleans')
+        bit = 1 << (self.offset + y)
+        if value:
+            self.grid.bits |= bit
+        else:
+            self.grid.bits &= ~bit
+
+    def __len__(self):
+        return self.grid.height
 
 
 def reconstituteGrid(bitRep):
+    if type(bitRep) is bytes:
+        return Grid.unpackBits(bitRep)
     if type(bitRep) is not type((1, 2)):
         return bitRep
     width, height = bitRep[:2]
@@ -349,7 +522,26 @@ class Actions:
         return (dx * speed, dy * speed)
     directionToVector = staticmethod(directionToVector)
 
+    def getMoveTable(walls):
+        """
+        Returns the MoveTable of a walls Grid, built on first use and then
+        kept on the Grid (and shared by Grids with the same walls).
+        """
+        table = getattr(walls, '_moveTable', None)
+        if table == None:
+            key = (walls.width, walls.height, walls.asBits())
+            if key not in MOVE_TABLES:
+                MOVE_TABLES[key] = MoveTable(walls)
+            table = walls._moveTable = MOVE_TABLES[key]
+        return table
+    getMoveTable = staticmethod(getMoveTable)
+
     def getPossibleActions(config, walls):
+        actions = Actions.getMoveTable(walls).actions.get(config.pos)
+        if actions != None:
+            return list(actions)
+
+        # Off the grid points (or on a wall): work it out from the position
         possible = []
         x, y = config.pos
         x_int, y_int = int(x + 0.5), int(y + 0.5)
@@ -370,6 +562,10 @@ class Actions:
     getPossibleActions = staticmethod(getPossibleActions)
 
     def getLegalNeighbors(position, walls):
+        neighbors = Actions.getMoveTable(walls).neighbors.get(position)
+        if neighbors != None:
+            return list(neighbors)
+
         x, y = position
         x_int, y_int = int(x + 0.5), int(y + 0.5)
         neighbors = []
@@ -393,6 +589,94 @@ class Actions:
     getSuccessor = staticmethod(getSuccessor)
 
 
+# MoveTables by (width, height, walls.asBits())
+MOVE_TABLES = {}
+
+
+class MoveTable:
+    """
+    The moves available from every open cell of a walls Grid, computed once
+    so that the rules, the ghosts and search problems do not redo the wall
+    checks for each state.  Get it with Actions.getMoveTable(walls) or
+    Layout.getMoveTable().  Keys are integer cells (x,y); agents between
+    grid points are not in the tables.
+
+      actions[cell]       directions legal at cell, as Actions.getPossibleActions
+                          gives them (Stop included)
+      neighbors[cell]     cells one legal move away, as
+                          Actions.getLegalNeighbors gives them (cell included)
+      successors[cell]    (nextCell, direction) pairs for the moves out of
+                          cell, in the North, South, East, West order search
+                          problems expand them
+      predecessors[cell]  (previousCell, direction) pairs for the moves into
+                          cell, in the same order
+    """
+
+    def __init__(self, walls):
+        self.actions = {}
+        self.neighbors = {}
+        self.successors = {}
+        self.predecessors = {}
+
+        def isOpen(x, y):
+            return 0 <= x < walls.width and 0 <= y < walls.height and not walls[x][y]
+
+        searchOrder = [Directions.NORTH, Directions.SOUTH,
+                       Directions.EAST, Directions.WEST]
+        for x in range(walls.width):
+            for y in range(walls.height):
+                if walls[x][y]:
+                    continue
+                cell = (x, y)
+                self.actions[cell] = tuple([dir for dir, (dx, dy) in Actions._directionsAsList
+                                            if isOpen(x + dx, y + dy)])
+                self.neighbors[cell] = tuple([(x + dx, y + dy) for dir, (dx, dy) in Actions._directionsAsList
+                                              if isOpen(x + dx, y + dy)])
+                successors, predecessors = [], []
+                for dir in searchOrder:
+                    dx, dy = Actions._directions[dir]
+                    if isOpen(x + dx, y + dy):
+                        successors.append(((x + dx, y + dy), dir))
+                    if isOpen(x - dx, y - dy):
+                        predecessors.append(((x - dx, y - dy), dir))
+                self.successors[cell] = tuple(successors)
+                self.predecessors[cell] = tuple(predecessors)
+
+
+# Zobrist keys: a random 64-bit key per feature of a game state
+ZOBRIST_KEYS = {}
+ZOBRIST_MASK = 0xFFFFFFFFFFFFFFFF
+
+
+def canonicalFeature(feature):
+    """
+    Returns feature with whole floats (and bools) written as ints, in
+    tuples too, so that features that compare equal have one repr.
+    """
+    if isinstance(feature, tuple):
+        return tuple([canonicalFeature(part) for part in feature])
+    if isinstance(feature, bool) or (isinstance(feature, float) and feature.is_integer()):
+        return int(feature)
+    return feature
+
+
+def zobristKey(feature):
+    """
+    Returns the 64-bit key of a state feature such as ('food', x, y).  Keys
+    are digests of the feature, so they do not depend on PYTHONHASHSEED or
+    on the order features are met in, and agree across processes.
+
+    Features that compare equal share a cache entry, such as a ghost at
+    (8, 5) and at (8.0, 5.0), so the digest is taken of the canonical form
+    of the feature, whichever form comes first.
+    """
+    key = ZOBRIST_KEYS.get(feature)
+    if key == None:
+        digest = hashlib.blake2b(repr(canonicalFeature(feature)).encode(), digest_size=8).digest()
+        key = ZOBRIST_KEYS[feature] = int.from_bytes(digest, 'little')
+    return key
+
+
 class GameStateData:
 
     def __init__(self, prevState=None):
@@ -400,12 +684,35 @@ class GameStateData:
         Generates a new data packet by copying information from its predecessor.
         """
         if prevState != None:
-            self.food = prevState.food.shallowCopy()
-            self.capsules = prevState.capsules[:]
-            self.agentStates = self.copyAgentStates(prevState.agentStates)
+            # The food, capsules, agent states and _eaten flags are shared
+            # with the predecessor until written: the rules get private copies
+            # through getMutableAgentState and getMutableCapsules, and replace
+            # food and _eaten rather than change them.
+            self.food = prevState.food
+            self.capsules = prevState.capsules
+            self.agentStates = prevState.agentStates
             self.layout = prevState.layout
             self._eaten = prevState._eaten
             self.score = prevState.score
+            self._zobrist = prevState._zobrist
+            self._unhashedAgents = prevState._unhashedAgents
+        else:
+            self._zobrist = 0
+            self._unhashedAgents = 0
+        # Bit i is set once agentStates[i] is private to this state
+        self._ownedAgentStates = 0 if prevState != None else -1
+        self._ownsCapsules = prevState == None
+        # Set on the data of a view, whose accessors hand out copies (see
+        # GameState.getReadOnlyView).  What a view shares with the game is
+        # copied once into its successors, so that no state below a view
+        # reaches the game's own food, capsules or agent states.
+        self._readOnly = False
+        if prevState != None and prevState._readOnly:
+            self.food = prevState.food.copy()
+            self.capsules = prevState.capsules[:]
+            self.agentStates = self.copyAgentStates(prevState.agentStates)
+            self._ownedAgentStates = -1
+            self._ownsCapsules = True
 
         self._foodEaten = None
         self._foodAdded = None
@@ -415,9 +722,28 @@ class GameStateData:
         self._win = False
         self.scoreChange = 0
 
+    def view(self):
+        """
+        Returns a copy that shares everything with this data, for agents to
+        look at.  Like a successor, it copies before any rule changes it.
+        """
+        state = GameStateData(self)
+        state._agentMoved = self._agentMoved
+        state._foodEaten = self._foodEaten
+        state._foodAdded = self._foodAdded
+        state._capsuleEaten = self._capsuleEaten
+        state._readOnly = True
+        return state
+
     def deepCopy(self):
         state = GameStateData(self)
         state.food = self.food.deepCopy()
+        state.capsules = self.capsules[:]
+        state.agentStates = self.copyAgentStates(self.agentStates)
+        state._eaten = self._eaten[:]
+        state._ownedAgentStates = -1
+        state._ownsCapsules = True
+        state._readOnly = False
         state.layout = self.layout.deepCopy()
         state._agentMoved = self._agentMoved
         state._foodEaten = self._foodEaten
@@ -431,6 +757,79 @@ class GameStateData:
             copiedStates.append(agentState.copy())
         return copiedStates
 
+    def getMutableAgentState(self, index):
+        """
+        Returns agent state index, after copying it if it is still shared
+        with the predecessor.  Rules must go through this before changing an
+        agent state.
+        """
+        if not self._ownedAgentStates >> index & 1:
+            if not self._ownedAgentStates:
+                self.agentStates = self.agentStates[:]
+            self.agentStates[index] = self.agentStates[index].copy()
+            self._ownedAgentStates |= 1 << index
+        if not self._unhashedAgents >> index & 1:
+            # Its key goes back into the hash once the rules are done with it
+            self._zobrist ^= self._agentKey(index)
+            self._unhashedAgents |= 1 << index
+        return self.agentStates[index]
+
+    def getMutableCapsules(self):
+        """
+        Returns the capsule list, after copying it if it is still shared
+        with the predecessor.
+        """
+        if not self._ownsCapsules:
+            self.capsules = self.capsules[:]
+            self._ownsCapsules = True
+        return self.capsules
+
+    def _agentKey(self, index):
+        agentState = self.agentStates[index]
+        configuration = agentState.configuration
+        if configuration == None:
+            key = zobristKey((index, None))
+        else:
+            key = zobristKey((index, configuration.pos, configuration.direction))
+        return key ^ zobristKey((index, 'scared', agentState.scaredTimer))
+
+    def foodKey(position):
+        return zobristKey(('food',) + tuple(position))
+    foodKey = staticmethod(foodKey)
+
+    def capsuleKey(position):
+        return zobristKey(('capsule',) + tuple(position))
+    capsuleKey = staticmethod(capsuleKey)
+
+    def _computeZobrist(self):
+        """
+        Hashes the agents, food and capsules from scratch.  Successors update
+        the hash instead: PacmanRules.consume toggles the keys of what
+        Pacman eats, and agents are rehashed after getMutableAgentState.
+        """
+        zobrist = 0
+        for index in range(len(self.agentStates)):
+            zobrist ^= self._agentKey(index)
+        for position in self.food.asList():
+            zobrist ^= self.foodKey(position)
+        for position in self.capsules:
+            zobrist ^= self.capsuleKey(position)
+        self._zobrist = zobrist
+        self._unhashedAgents = 0
+
+    def zobristHash(self):
+        """
+        Returns the 64-bit Zobrist hash of the agents, food, capsules and
+        score, in O(number of agents that changed since the last call).
+        """
+        unhashed = self._unhashedAgents
+        if unhashed:
+            for index in range(len(self.agentStates)):
+                if unhashed >> index & 1:
+                    self._zobrist ^= self._agentKey(index)
+            self._unhashedAgents = 0
+        return (self._zobrist ^ hash(self.score) * 0x9E3779B97F4A7C15) & ZOBRIST_MASK
+
     def __eq__(self, other):
         """
         Allows two states to be compared.
@@ -438,6 +837,8 @@ class GameStateData:
         if other == None:
             return False
         # TODO Check for type of other
+        if self.zobristHash() != other.zobristHash():
+            return False
         if not self.agentStates == other.agentStates:
             return False
         if not self.food == other.food:
@@ -452,13 +853,7 @@ class GameStateData:
         """
         Allows states to be keys of dictionaries.
         """
-        for i, state in enumerate(self.agentStates):
-            try:
-                int(hash(state))
-            except TypeError as e:
-                print(e)
-                # hash(state)
-        return int((hash(tuple(self.agentStates)) + 13*hash(self.food) + 113 * hash(tuple(self.capsules)) + 7 * hash(self.score)) % 1048575)
+        return self.zobristHash()
 
     def __str__(self):
         width, height = self.layout.width, self.layout.height
@@ -536,6 +931,7 @@ class GameStateData:
             self.agentStates.append(AgentState(
                 Configuration(pos, Directions.STOP), isPacman))
         self._eaten = [False for a in self.agentStates]
+        self._computeZobrist()
 
 
 try:
@@ -601,6 +997,15 @@ class Game:
         sys.stdout = OLD_STDOUT
         sys.stderr = OLD_STDERR
 
+    def stateFor(self, agent):
+        """
+        Returns the state to hand to an agent: a read-only view of the game
+        state, or a deep copy if the agent asked for mutableState.
+        """
+        if getattr(agent, 'mutableState', False) or not hasattr(self.state, 'getReadOnlyView'):
+            return self.state.deepCopy()
+        return self.state.getReadOnlyView()
+
     def run(self):
         """
         Main control loop for game play.
@@ -620,6 +1025,10 @@ class Game:
                 self.unmute()
                 self._agentCrash(i, quiet=True)
                 return
+            if ("setTimeLimits" in dir(agent)):
+                # Anytime agents plan their moves around the time limits
+                agent.setTimeLimits(min(self.rules.getMoveTimeout(i), self.rules.getMoveWarningTime(i)),
+                                    self.rules.getMaxTotalTime(i))
             if ("registerInitialState" in dir(agent)):
                 self.mute(i)
                 if self.catchExceptions:
@@ -628,7 +1037,7 @@ class Game:
                             agent.registerInitialState, int(self.rules.getMaxStartupTime(i)))
                         try:
                             start_time = time.time()
-                            timed_func(self.state.deepCopy())
+                            timed_func(self.stateFor(agent))
                             time_taken = time.time() - start_time
                             self.totalAgentTimes[i] += time_taken
                         except TimeoutFunctionException:
@@ -643,7 +1052,7 @@ class Game:
                         self.unmute()
                         return
                 else:
-                    agent.registerInitialState(self.state.deepCopy())
+                    agent.registerInitialState(self.stateFor(agent))
                 # TODO: could this exceed the total time
                 self.unmute()
 
@@ -664,7 +1073,7 @@ class Game:
                             self.rules.getMoveTimeout(agentIndex)))
                         try:
                             start_time = time.time()
-                            observation = timed_func(self.state.deepCopy())
+                            observation = timed_func(self.stateFor(agent))
                         except TimeoutFunctionException:
                             skip_action = True
                         move_time += time.time() - start_time
@@ -674,11 +1083,10 @@ class Game:
                         self.unmute()
                         return
                 else:
-                    observation = agent.observationFunction(
-                        self.state.deepCopy())
+                    observation = agent.observationFunction(self.stateFor(agent))
                 self.unmute()
             else:
-                observation = self.state.deepCopy()
+                observation = self.stateFor(agent)
 
             # Solicit an action
             action = None
@@ -21,24 +21,60 @@ import util
 
 
 class GhostAgent(Agent):
+    # The most distributions a ghost keeps in its table
+    TABLE_SIZE = 100000
+
     def __init__(self, index):
         self.index = index
+        self.table, self.tableLayout = {}, None
 
     def getAction(self, state):
-        dist = self.getDistribution(state)
-        if len(dist) == 0:
+        items, probabilities, actions = self.getTableDistribution(state)
+        if len(items) == 0:
             return Directions.STOP
         else:
-            return util.chooseFromDistribution(dist)
+            # As util.chooseFromDistribution samples the Counter
+            return util.sample(probabilities, actions)
 
     def getDistribution(self, state):
         "Returns a Counter encoding a distribution over actions from the provided state."
         util.raiseNotDefined()
 
+    def getTableKey(self, state):
+        """
+        Returns the part of the state getDistribution depends on, or None
+        if its distributions are not to be kept in a table.
+        """
+        return None
+
+    def getTableDistribution(self, state):
+        """
+        Returns the distribution of getDistribution as (action, probability)
+        pairs sorted by action, and the probabilities and actions of the
+        pairs as lists for util.sample.  They are computed the first time
+        their table key comes up on a layout, and then kept, up to
+        TABLE_SIZE of them.
+        """
+        # Subclasses that set self.index themselves have no table yet
+        if getattr(self, 'tableLayout', None) is not state.data.layout:
+            self.table, self.tableLayout = {}, state.data.layout
+        key = self.getTableKey(state)
+        entry = self.table.get(key) if key != None else None
+        if entry == None:
+            items = tuple(sorted(self.getDistribution(state).items()))
+            entry = (items, [p for a, p in items], [a for a, p in items])
+            if key != None and len(self.table) < self.TABLE_SIZE:
+                self.table[key] = entry
+        return entry
+
 
 class RandomGhost(GhostAgent):
     "A ghost that chooses a legal action uniformly at random."
 
+    def getTableKey(self, state):
+        configuration = state.getGhostState(self.index).configuration
+        return (configuration.pos, configuration.direction)
+
     def getDistribution(self, state):
         dist = util.Counter()
         for a in state.getLegalActions(self.index):
@@ -51,10 +87,16 @@ class DirectionalGhost(GhostAgent):
     "A ghost that prefers to rush Pacman, or flee when scared."
 
     def __init__(self, index, prob_attack=0.8, prob_scaredFlee=0.8):
-        self.index = index
+        GhostAgent.__init__(self, index)
         self.prob_attack = prob_attack
         self.prob_scaredFlee = prob_scaredFlee
 
+    def getTableKey(self, state):
+        ghostState = state.getGhostState(self.index)
+        configuration = ghostState.configuration
+        return (configuration.pos, configuration.direction,
+                state.getPacmanPosition(), ghostState.scaredTimer > 0)
+
     def getDistribution(self, state):
         # Read variables from state
         ghostState = state.getGhostState(self.index)
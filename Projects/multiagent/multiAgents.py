@@ -14,7 +14,9 @@
 
 from util import manhattanDistance
 from game import Directions
-import random, util
+from game import Actions
+import random, util, time, math
+import rolloutPacman
 
 from game import Agent
 from pacman import GameState
@@ -87,6 +89,57 @@ def scoreEvaluationFunction(currentGameState: GameState):
     """
     return currentGameState.getScore()
 
+def nearestFoodDistance(food, numFood, position, limit):
+    """
+    Returns the manhattan distance from position to the nearest food, or
+    None if it is more than limit.  Small limits only look at the cells
+    that close.
+    """
+    if numFood == 0:
+        return None
+    if 2 * limit * (limit + 1) > numFood:
+        distance = min([manhattanDistance(position, f) for f in food.asList()])
+        return distance if distance <= limit else None
+    x, y = position
+    for distance in range(1, limit + 1):
+        for dx in range(-distance, distance + 1):
+            dy = distance - abs(dx)
+            if 0 <= x + dx < food.width:
+                column = food[x + dx]
+                if (0 <= y + dy < food.height and column[y + dy]) or (dy and 0 <= y - dy < food.height and column[y - dy]):
+                    return distance
+    return None
+
+def scoreEvaluationBounds(currentGameState: GameState, pacmanMoves):
+    """
+    Returns bounds on the score of any state reached from currentGameState
+    within pacmanMoves Pacman moves.  Each of those moves costs a point and
+    earns at most 10 for food once Pacman can reach it; clearing the board
+    earns 500, each scared ghost eaten (again after every capsule reached)
+    200, and each ghost that catches Pacman costs 500.
+    """
+    score = currentGameState.getScore()
+    position = currentGameState.getPacmanPosition()
+    numGhosts = currentGameState.getNumAgents() - 1
+    numFood = currentGameState.getNumFood()
+    high = score
+    distance = nearestFoodDistance(currentGameState.getFood(), numFood, position, pacmanMoves)
+    if distance != None:
+        reach = pacmanMoves + 1 - distance
+        high += 9 * min(reach, numFood)
+        if numFood <= reach:
+            high += 500
+    ghostsEaten = len([ghost for ghost in currentGameState.getGhostStates() if ghost.scaredTimer > 0])
+    capsules = currentGameState.getCapsules()
+    if capsules:
+        reach = pacmanMoves + 1 - min([manhattanDistance(position, c) for c in capsules])
+        if reach > 0:
+            ghostsEaten += numGhosts * min(reach, len(capsules))
+    return score - pacmanMoves - 500 * numGhosts, high + 200 * ghostsEaten
+
+# Evaluation functions declare bounds like this for ExpectimaxAgent's pruning
+scoreEvaluationFunction.bounds = scoreEvaluationBounds
+
 class MultiAgentSearchAgent(Agent):
     """
     This class provides some common elements to all of your
@@ -102,10 +155,127 @@ class MultiAgentSearchAgent(Agent):
     is another abstract class.
     """
 
-    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2'):
+    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2', tableSize = '0', workers = '0'):
         self.index = 0 # Pacman is always agent index 0
         self.evaluationFunction = util.lookup(evalFn, globals())
         self.depth = int(depth)
+        # A transposition table lets the searches reuse the values of states
+        # reached by different move orders (e.g. -a depth=4,tableSize=100000).
+        # It is off by default, so every state is expanded as in the plain
+        # algorithms.
+        tableSize = int(tableSize)
+        self.transpositionTable = util.TranspositionTable(tableSize) if tableSize > 0 else None
+        # With more than one worker (e.g. -a depth=4,workers=4), Pacman's
+        # moves at the root are searched in a pool of forked processes; see
+        # getParallelAction.
+        self.workers = int(workers)
+        self.pool = None
+
+    def getTableKey(self, gameState, agentIndex):
+        """
+        Returns the transposition table key of gameState with agentIndex to
+        move, or None when there is no table or the state cannot be hashed.
+        """
+        if self.transpositionTable == None or not hasattr(gameState, 'zobristHash'):
+            return None
+        return (gameState.zobristHash(), agentIndex)
+
+    def getTableStats(self):
+        """
+        Returns the hit-rate statistics of the transposition table (see
+        util.TranspositionTable.getStats), or None when it is off.
+        """
+        if self.transpositionTable == None:
+            return None
+        return self.transpositionTable.getStats()
+
+    def isCutoff(self, gameState, plies):
+        return plies == 0 or gameState.isWin() or gameState.isLose()
+
+    def searchRootMove(self, gameState, plies, alpha):
+        """
+        Returns the (value, exact) of gameState, the successor of one of
+        Pacman's moves at the root, with the first ghost to move and plies
+        moves left.  Unless exact, the value is only a bound that is below
+        alpha, the best value of another move.  Subclasses that search in
+        parallel define it.
+        """
+        util.raiseNotDefined()
+
+    def getParallelAction(self, gameState):
+        """
+        Searches each of Pacman's moves at the root in a worker process and
+        returns the first of the best ones, as the serial search would.  The
+        workers share the best value found so far through self.alpha.
+        Returns None when the search has to stay in this process.
+        """
+        if gameState.isWin() or gameState.isLose() or not self.startSearchPool(gameState):
+            return None
+        if self.transpositionTable != None:
+            self.transpositionTable.newSearch()
+        actions = gameState.getLegalActions(0)
+        # The workers have their own layout, from when they were forked
+        state = gameState.getReadOnlyView()
+        state.data.layout = None
+        self.alpha.value = -float('inf')
+        results = self.pool.map(runRootMoveTask, [(state, action) for action in actions], 1)
+        bestValue, bestAction = None, None
+        for action, (value, exact) in zip(actions, results):
+            if exact and (bestValue == None or value > bestValue):
+                bestValue, bestAction = value, action
+        return bestAction
+
+    def startSearchPool(self, gameState):
+        """
+        Forks the workers of getParallelAction, unless they are already
+        running for the layout of gameState.  Returns False if processes
+        cannot fork here, e.g. inside the worker of a parallel game.
+        """
+        global PARALLEL_SEARCH
+        import multiprocessing
+        layout = gameState.data.layout
+        if self.pool != None and self.poolLayout is layout:
+            return True
+        self.stopSearchPool()
+        if multiprocessing.current_process().daemon:
+            return False
+        try:
+            context = multiprocessing.get_context('fork')
+        except ValueError:
+            return False
+        self.alpha = context.Value('d', -float('inf'))
+        self.poolLayout = layout
+        PARALLEL_SEARCH = self
+        self.pool = context.Pool(self.workers)
+        return True
+
+    def stopSearchPool(self):
+        if self.pool != None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = self.alpha = self.poolLayout = None
+
+    def final(self, state):
+        "Stops the search workers at the end of the game"
+        self.stopSearchPool()
+
+# The agent whose root moves the search workers search
+PARALLEL_SEARCH = None
+
+def runRootMoveTask(task):
+    "Searches one of Pacman's moves at the root in a search worker"
+    gameState, action = task
+    agent = PARALLEL_SEARCH
+    gameState.data.layout = agent.poolLayout
+    if agent.transpositionTable != None:
+        agent.transpositionTable.newSearch()
+    plies = agent.depth * gameState.getNumAgents()
+    alpha = agent.alpha
+    value, exact = agent.searchRootMove(gameState.generateSuccessor(0, action), plies - 1, alpha.value)
+    if exact:
+        with alpha.get_lock():
+            alpha.value = max(alpha.value, value)
+    return value, exact
 
 class MinimaxAgent(MultiAgentSearchAgent):
     """
@@ -135,8 +305,41 @@ class MinimaxAgent(MultiAgentSearchAgent):
         gameState.isLose():
         Returns whether or not the game state is a losing state
         """
-        "*** YOUR CODE HERE ***"
-        util.raiseNotDefined()
+        if self.workers > 1:
+            action = self.getParallelAction(gameState)
+            if action != None:
+                return action
+        if self.transpositionTable != None:
+            self.transpositionTable.newSearch()
+        plies = self.depth * gameState.getNumAgents()
+        return self.minimax(gameState, 0, plies)[1]
+
+    def searchRootMove(self, gameState, plies, alpha):
+        return self.minimax(gameState, 1, plies)[0], True
+
+    def minimax(self, gameState, agentIndex, plies):
+        """
+        Returns the (value, action) of gameState with agentIndex to move and
+        plies single-agent moves left to search.
+        """
+        if self.isCutoff(gameState, plies):
+            return self.evaluationFunction(gameState), None
+        key = self.getTableKey(gameState, agentIndex)
+        if key != None:
+            entry = self.transpositionTable.lookup(key)
+            if entry != None and entry[1] == plies:
+                return entry[0], entry[3]
+
+        nextAgent = (agentIndex + 1) % gameState.getNumAgents()
+        bestValue, bestAction = None, None
+        for action in gameState.getLegalActions(agentIndex):
+            value = self.minimax(gameState.generateSuccessor(agentIndex, action), nextAgent, plies - 1)[0]
+            if bestValue == None or (value > bestValue if agentIndex == 0 else value < bestValue):
+                bestValue, bestAction = value, action
+
+        if key != None:
+            self.transpositionTable.store(key, bestValue, plies, util.TranspositionTable.EXACT, bestAction)
+        return bestValue, bestAction
 
 class AlphaBetaAgent(MultiAgentSearchAgent):
     """
@@ -147,14 +350,260 @@ class AlphaBetaAgent(MultiAgentSearchAgent):
         """
         Returns the minimax action using self.depth and self.evaluationFunction
         """
-        "*** YOUR CODE HERE ***"
-        util.raiseNotDefined()
+        if self.workers > 1:
+            action = self.getParallelAction(gameState)
+            if action != None:
+                return action
+        if self.transpositionTable != None:
+            self.transpositionTable.newSearch()
+        plies = self.depth * gameState.getNumAgents()
+        return self.alphaBeta(gameState, 0, plies, -float('inf'), float('inf'))[1]
+
+    def searchRootMove(self, gameState, plies, alpha):
+        value = self.alphaBeta(gameState, 1, plies, alpha, float('inf'))[0]
+        return value, value >= alpha
+
+    def alphaBeta(self, gameState, agentIndex, plies, alpha, beta):
+        """
+        Returns the (value, action) of gameState with agentIndex to move, as
+        minimax would, except that a value above beta (below alpha) for
+        Pacman (a ghost) ends the search of the node early.  The value is
+        then only a lower (upper) bound, which is what the transposition
+        table records.
+        """
+        if self.isCutoff(gameState, plies):
+            return self.evaluationFunction(gameState), None
+        table = self.transpositionTable
+        key = self.getTableKey(gameState, agentIndex)
+        actions = gameState.getLegalActions(agentIndex)
+        if key != None:
+            entry = table.lookup(key)
+            if entry != None:
+                value, depth, bound, move = entry
+                if depth == plies and (bound == table.EXACT or
+                                       (bound == table.LOWER and value > beta) or
+                                       (bound == table.UPPER and value < alpha)):
+                    return value, move
+                # Otherwise its best move is a good first guess
+                if move in actions and plies < self.depth * gameState.getNumAgents():
+                    actions.remove(move)
+                    actions.insert(0, move)
+
+        nextAgent = (agentIndex + 1) % gameState.getNumAgents()
+        originalAlpha, originalBeta = alpha, beta
+        bestValue, bestAction = None, None
+        pruned = False
+        for action in actions:
+            value = self.alphaBeta(gameState.generateSuccessor(agentIndex, action), nextAgent, plies - 1, alpha, beta)[0]
+            if agentIndex == 0:
+                if bestValue == None or value > bestValue:
+                    bestValue, bestAction = value, action
+                if bestValue > beta:
+                    pruned = True
+                    break
+                alpha = max(alpha, bestValue)
+            else:
+                if bestValue == None or value < bestValue:
+                    bestValue, bestAction = value, action
+                if bestValue < alpha:
+                    pruned = True
+                    break
+                beta = min(beta, bestValue)
+
+        if key != None:
+            if agentIndex == 0:
+                bound = table.LOWER if pruned else table.UPPER if bestValue < originalAlpha else table.EXACT
+            else:
+                bound = table.UPPER if pruned else table.LOWER if bestValue > originalBeta else table.EXACT
+            table.store(key, bestValue, plies, bound, bestAction)
+        return bestValue, bestAction
+
+class SearchTimeout(Exception):
+    "Raised when a search runs past its deadline"
+    pass
+
+class AnytimeAlphaBetaAgent(MultiAgentSearchAgent):
+    """
+    An alpha-beta agent that searches one more level (a ply for every agent)
+    at a time until its time for the move runs out, and plays the move of
+    the deepest search it finished.  The first level is always finished.
+
+    Its time for a move is timeFraction of the smaller of the rules' move
+    timeout and the time it has left in the game (see setTimeLimits), and
+    it stops deepening after maxDepth levels unless maxDepth is 0.  Moves
+    are tried in order of the principal variation of the last search (or
+    the move in the transposition table, with tableSize > 0), then the
+    killer moves of the ply, then the history heuristic.
+
+    The depth it reached on each move is kept in self.depthsReached.
+    """
+
+    def __init__(self, evalFn = 'scoreEvaluationFunction', tableSize = '0',
+                 timeFraction = '0.05', maxDepth = '0'):
+        MultiAgentSearchAgent.__init__(self, evalFn, tableSize = tableSize)
+        self.timeFraction = float(timeFraction)
+        self.maxDepth = int(maxDepth)
+        # ClassicGameRules' default timeout, until the game says otherwise
+        self.moveTime, self.totalTime = 30.0, None
+        self.registerInitialState(None)
+
+    def setTimeLimits(self, moveTime, totalTime):
+        "Called by the game with the seconds a move and the whole game may take"
+        self.moveTime, self.totalTime = moveTime, totalTime
+
+    def registerInitialState(self, gameState):
+        self.timeSpent = 0.0
+        self.depthsReached = []
+        self.history = {}
+
+    def getMoveBudget(self):
+        "Returns the seconds the next move may take"
+        budget = self.moveTime
+        if self.totalTime != None:
+            budget = min(budget, self.totalTime - self.timeSpent)
+        return max(0.0, budget * self.timeFraction)
+
+    def getAction(self, gameState: GameState):
+        """
+        Returns the move of the deepest alpha-beta search finished in time
+        """
+        start = time.time()
+        deadline = start + self.getMoveBudget()
+        numAgents = gameState.getNumAgents()
+        self.killers = {}
+        if self.transpositionTable != None:
+            self.transpositionTable.newSearch()
+        for move in list(self.history):
+            self.history[move] //= 2
+
+        depth, bestAction, line = 0, None, []
+        while self.maxDepth == 0 or depth < self.maxDepth:
+            iterationStart = time.time()
+            # Until a level is finished there is no move, so the first one
+            # runs to the end
+            self.deadline = deadline if bestAction != None else None
+            self.reachedCutoff = False
+            try:
+                value, line = self.search(gameState, 0, (depth + 1) * numAgents,
+                                          -float('inf'), float('inf'), 0, line)
+            except SearchTimeout:
+                break
+            depth, bestAction = depth + 1, line[0]
+            # Stop once the whole game tree is searched, or when the next
+            # level, which takes longer than this one, cannot finish
+            now = time.time()
+            if not self.reachedCutoff or now + (now - iterationStart) > deadline:
+                break
+
+        self.depthsReached.append(depth)
+        self.timeSpent += time.time() - start
+        return bestAction
+
+    def search(self, gameState, agentIndex, plies, alpha, beta, ply, principal):
+        """
+        Returns the value of gameState with agentIndex to move and plies
+        single-agent moves left, as AlphaBetaAgent.alphaBeta would, and the
+        line of moves that leads to it.  ply counts the moves from the root,
+        and principal is the line of the last search from this state, if it
+        is on that line.
+        """
+        if self.deadline != None and time.time() > self.deadline:
+            raise SearchTimeout()
+        if gameState.isWin() or gameState.isLose():
+            return self.evaluationFunction(gameState), []
+        if plies == 0:
+            self.reachedCutoff = True
+            return self.evaluationFunction(gameState), []
+
+        table = self.transpositionTable
+        key = self.getTableKey(gameState, agentIndex)
+        tableMove = None
+        if key != None:
+            entry = table.lookup(key)
+            if entry != None:
+                value, depth, bound, tableMove = entry
+                # The root always searches, so that there is a move to play
+                if ply > 0 and depth == plies and (bound == table.EXACT or
+                                                   (bound == table.LOWER and value > beta) or
+                                                   (bound == table.UPPER and value < alpha)):
+                    # As the search it stands for would have
+                    self.reachedCutoff = True
+                    return value, [tableMove] if tableMove != None else []
+
+        position = gameState.getPacmanPosition() if agentIndex == 0 else gameState.getGhostPosition(agentIndex)
+        actions = self.orderActions(gameState.getLegalActions(agentIndex), agentIndex, position, ply,
+                                    principal[0] if principal else tableMove)
+        nextAgent = (agentIndex + 1) % gameState.getNumAgents()
+        originalAlpha, originalBeta = alpha, beta
+        bestValue, bestLine = None, []
+        pruned = False
+        for action in actions:
+            childPrincipal = principal[1:] if principal and action == principal[0] else []
+            value, line = self.search(gameState.generateSuccessor(agentIndex, action), nextAgent, plies - 1,
+                                      alpha, beta, ply + 1, childPrincipal)
+            if agentIndex == 0:
+                if bestValue == None or value > bestValue:
+                    bestValue, bestLine = value, [action] + line
+                if bestValue > beta:
+                    self.recordCutoff(agentIndex, position, action, ply, plies)
+                    pruned = True
+                    break
+                alpha = max(alpha, bestValue)
+            else:
+                if bestValue == None or value < bestValue:
+                    bestValue, bestLine = value, [action] + line
+                if bestValue < alpha:
+                    self.recordCutoff(agentIndex, position, action, ply, plies)
+                    pruned = True
+                    break
+                beta = min(beta, bestValue)
+
+        if key != None:
+            if agentIndex == 0:
+                bound = table.LOWER if pruned else table.UPPER if bestValue < originalAlpha else table.EXACT
+            else:
+                bound = table.UPPER if pruned else table.LOWER if bestValue > originalBeta else table.EXACT
+            table.store(key, bestValue, plies, bound, bestLine[0])
+        return bestValue, bestLine
+
+    def orderActions(self, actions, agentIndex, position, ply, principalMove):
+        """
+        Puts the principal variation's move first, then the killer moves of
+        the ply, then the rest by their history scores.
+        """
+        first = [principalMove] if principalMove in actions else []
+        first += [move for move in self.killers.get(ply, []) if move in actions and move not in first]
+        rest = [action for action in actions if action not in first]
+        rest.sort(key=lambda action: -self.history.get((agentIndex, position, action), 0))
+        return first + rest
+
+    def recordCutoff(self, agentIndex, position, action, ply, plies):
+        "Remembers a move that ended the search of a node early"
+        killers = self.killers.setdefault(ply, [])
+        if action not in killers:
+            killers.insert(0, action)
+            del killers[2:]
+        move = (agentIndex, position, action)
+        self.history[move] = self.history.get(move, 0) + plies * plies
 
 class ExpectimaxAgent(MultiAgentSearchAgent):
     """
       Your expectimax agent (question 4)
+
+      With prune=1 (e.g. -a depth=3,prune=1) and an evaluation function that
+      declares bounds (see scoreEvaluationBounds), it prunes chance nodes as
+      Star1 does: it stops averaging the ghost moves once the moves left
+      cannot lift the average above a value Pacman already has.  It picks
+      the same actions as without pruning.
     """
 
+    # Slack for the rounding of the bounds, so that pruning stays safe
+    PRUNING_MARGIN = 1e-6
+
+    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2', tableSize = '0', prune = '0', workers = '0'):
+        MultiAgentSearchAgent.__init__(self, evalFn, depth, tableSize, workers)
+        self.prune = bool(int(prune)) and hasattr(self.evaluationFunction, 'bounds')
+
     def getAction(self, gameState: GameState):
         """
         Returns the expectimax action using self.depth and self.evaluationFunction
@@ -162,8 +611,348 @@ class ExpectimaxAgent(MultiAgentSearchAgent):
         All ghosts should be modeled as choosing uniformly at random from their
         legal moves.
         """
-        "*** YOUR CODE HERE ***"
-        util.raiseNotDefined()
+        if self.workers > 1:
+            action = self.getParallelAction(gameState)
+            if action != None:
+                return action
+        if self.transpositionTable != None:
+            self.transpositionTable.newSearch()
+        plies = self.depth * gameState.getNumAgents()
+        if self.prune:
+            return self.prunedExpectimax(gameState, 0, plies, -float('inf'), float('inf'))[2]
+        return self.expectimax(gameState, 0, plies)[1]
+
+    def searchRootMove(self, gameState, plies, alpha):
+        if self.prune:
+            value, bound, action = self.prunedExpectimax(gameState, 1, plies, alpha, float('inf'))
+            return value, bound == util.TranspositionTable.EXACT
+        return self.expectimax(gameState, 1, plies)[0], True
+
+    def expectimax(self, gameState, agentIndex, plies):
+        """
+        Returns the (value, action) of gameState with agentIndex to move: the
+        best value for Pacman, the average over the legal moves for a ghost.
+        """
+        if self.isCutoff(gameState, plies):
+            return self.evaluationFunction(gameState), None
+        key = self.getTableKey(gameState, agentIndex)
+        if key != None:
+            entry = self.transpositionTable.lookup(key)
+            if entry != None and entry[1] == plies:
+                return entry[0], entry[3]
+
+        nextAgent = (agentIndex + 1) % gameState.getNumAgents()
+        actions = gameState.getLegalActions(agentIndex)
+        values = [self.expectimax(gameState.generateSuccessor(agentIndex, action), nextAgent, plies - 1)[0]
+                  for action in actions]
+        if agentIndex == 0:
+            bestValue = max(values)
+            bestAction = actions[values.index(bestValue)]
+        else:
+            bestValue, bestAction = sum(values) / float(len(values)), None
+
+        if key != None:
+            self.transpositionTable.store(key, bestValue, plies, util.TranspositionTable.EXACT, bestAction)
+        return bestValue, bestAction
+
+    def getEvaluationBounds(self, gameState, agentIndex, plies):
+        """
+        Returns the evaluation function's bounds on the leaves below
+        gameState, with agentIndex to move and plies moves left.
+        """
+        numAgents = gameState.getNumAgents()
+        toPacman = (numAgents - agentIndex) % numAgents
+        pacmanMoves = max(0, (plies - toPacman + numAgents - 1) // numAgents)
+        return self.evaluationFunction.bounds(gameState, pacmanMoves)
+
+    def orderGhostActions(self, gameState, agentIndex, actions):
+        """
+        Returns the indices of a ghost's actions, those that take it closest
+        to Pacman first: their low values make the pruning come sooner.
+        """
+        x, y = gameState.getGhostPosition(agentIndex)
+        pacman = gameState.getPacmanPosition()
+        def distance(index):
+            dx, dy = Actions.directionToVector(actions[index])
+            return manhattanDistance((x + dx, y + dy), pacman)
+        return sorted(range(len(actions)), key=distance)
+
+    def prunedExpectimax(self, gameState, agentIndex, plies, alpha, beta, bounds=None):
+        """
+        Returns the (value, bound, action) of gameState.  The bound is EXACT
+        when value is the expectimax value, exactly as expectimax computes
+        it; UPPER when the expectimax value is at most alpha, which is then
+        the value; and LOWER when it is at least beta, which is the value.
+
+        Bounds on the leaves of a node hold for the nodes below it too, so
+        the ghosts after the first reuse the first ghost's bounds.
+        """
+        table = util.TranspositionTable
+        if self.isCutoff(gameState, plies):
+            return self.evaluationFunction(gameState), table.EXACT, None
+        key = self.getTableKey(gameState, agentIndex)
+        if key != None:
+            entry = self.transpositionTable.lookup(key)
+            if entry != None and entry[1] == plies:
+                return entry[0], table.EXACT, entry[3]
+
+        nextAgent = (agentIndex + 1) % gameState.getNumAgents()
+        actions = gameState.getLegalActions(agentIndex)
+        if agentIndex == 0:
+            bestValue, bestAction, failedLow = None, None, False
+            for action in actions:
+                floor = alpha if bestValue == None else max(alpha, bestValue)
+                value, bound, move = self.prunedExpectimax(gameState.generateSuccessor(agentIndex, action),
+                                                           nextAgent, plies - 1, floor, beta)
+                if bound == table.LOWER:
+                    return value, bound, action
+                if bound == table.UPPER:
+                    # No better than floor, so it cannot be the first best
+                    failedLow = True
+                    continue
+                if bestValue == None or value > bestValue:
+                    bestValue, bestAction = value, action
+                if bestValue >= beta:
+                    return bestValue, table.LOWER, bestAction
+            if bestValue == None or (failedLow and bestValue < alpha):
+                return alpha, table.UPPER, bestAction
+        else:
+            # Star1: each move gets the window that its value must leave for
+            # the average to leave (alpha, beta)
+            if bounds == None or agentIndex == 1:
+                bounds = self.getEvaluationBounds(gameState, agentIndex, plies)
+            low, high = bounds
+            margin = self.PRUNING_MARGIN
+            n = len(actions)
+            values, total = [None] * n, 0
+            for i, index in enumerate(self.orderGhostActions(gameState, agentIndex, actions)):
+                action, rest = actions[index], n - i - 1
+                value, bound, move = self.prunedExpectimax(gameState.generateSuccessor(agentIndex, action),
+                                                           nextAgent, plies - 1,
+                                                           n * alpha - total - rest * high - margin,
+                                                           n * beta - total - rest * low + margin, bounds)
+                if bound == table.UPPER:
+                    return alpha, bound, None
+                if bound == table.LOWER:
+                    return beta, bound, None
+                values[index] = value
+                total += value
+                if rest and (total + rest * high) / n + margin < alpha:
+                    return alpha, table.UPPER, None
+                if rest and (total + rest * low) / n - margin > beta:
+                    return beta, table.LOWER, None
+            bestValue, bestAction = sum(values) / float(n), None
+
+        if key != None:
+            self.transpositionTable.store(key, bestValue, plies, table.EXACT, bestAction)
+        return bestValue, table.EXACT, bestAction
+
+class MCTSNode:
+    """
+    A node of MCTSAgent's tree: Pacman to move at cell, after the moves
+    that lead to the node.  Ghost moves are drawn anew on every visit, so
+    a node stands for all the states those moves can reach.
+    """
+    __slots__ = ('cell', 'visits', 'total', 'children')
+
+    def __init__(self, cell):
+        self.cell = cell
+        self.visits = 0
+        self.total = 0.0
+        self.children = {}
+
+class MCTSAgent(Agent):
+    """
+    A Monte Carlo tree search (UCT) agent.  Each rollout walks down the
+    tree by the UCB1 rule, adds a node, and plays on for horizon moves with
+    the rollout policy of rolloutPacman.RolloutEngine, which keeps states
+    as ints rather than GameStates.  The final score is the rollout's value.
+    It plays the most visited move, and keeps that move's subtree for the
+    next turn.
+
+    It runs rollouts for timeFraction of its time for the move, as
+    AnytimeAlphaBetaAgent does, or exactly rollouts of them if that is
+    not 0.  With more than one worker (e.g. -a workers=4), every worker
+    process grows a tree of its own and the root statistics are summed.
+
+    The rollouts per second of each move are kept in self.rolloutRates,
+    and final() prints the rate over the whole game at the end of it.
+    """
+
+    def __init__(self, timeFraction = '0.01', rollouts = '0', horizon = '20',
+                 exploration = '500', workers = '0'):
+        self.index = 0 # Pacman is always agent index 0
+        self.timeFraction = float(timeFraction)
+        self.maxRollouts = int(rollouts)
+        self.horizon = int(horizon)
+        self.exploration = float(exploration)
+        self.workers = int(workers)
+        # ClassicGameRules' default timeout, until the game says otherwise
+        self.moveTime, self.totalTime = 30.0, None
+        self.engine = self.pool = None
+        self.registerInitialState(None)
+
+    def setTimeLimits(self, moveTime, totalTime):
+        "Called by the game with the seconds a move and the whole game may take"
+        self.moveTime, self.totalTime = moveTime, totalTime
+
+    def registerInitialState(self, gameState):
+        self.timeSpent = 0.0
+        self.rolloutRates = []
+        self.rolloutCount = 0
+        self.moveNumber = self.treeMove = 0
+        self.tree = self.lastAction = None
+
+    def getMoveBudget(self):
+        "Returns the seconds the next move may take"
+        budget = self.moveTime
+        if self.totalTime != None:
+            budget = min(budget, self.totalTime - self.timeSpent)
+        return max(0.0, budget * self.timeFraction)
+
+    def getAction(self, gameState: GameState):
+        """
+        Returns the most visited move at the root after the rollouts
+        """
+        start = time.time()
+        deadline = start + self.getMoveBudget()
+        if self.engine == None or self.engineLayout is not gameState.data.layout:
+            self.stopRolloutPool()
+            self.engine, self.engineLayout = rolloutPacman.RolloutEngine(gameState.data.layout), gameState.data.layout
+        state = self.engine.getState(gameState)
+        self.moveNumber += 1
+
+        if self.workers > 1 and self.startRolloutPool():
+            tasks = [(state, self.moveNumber, self.lastAction, deadline, random.random())
+                     for i in range(self.workers)]
+            stats, rollouts = {}, 0
+            for workerStats, workerRollouts in self.pool.map(searchRolloutTree, tasks, 1):
+                for action, (visits, total) in workerStats.items():
+                    oldVisits, oldTotal = stats.get(action, (0, 0.0))
+                    stats[action] = (oldVisits + visits, oldTotal + total)
+                rollouts += workerRollouts
+        else:
+            root = self.getRoot(state, self.moveNumber, self.lastAction)
+            rollouts = self.runRollouts(root, state, deadline, random)
+            stats = dict([(action, (child.visits, child.total)) for action, child in root.children.items()])
+
+        legal = gameState.getLegalActions(self.index)
+        action = max(legal, key=lambda action: stats.get(action, (0, 0.0)))
+        self.lastAction = action
+        elapsed = time.time() - start
+        self.timeSpent += elapsed
+        self.rolloutCount += rollouts
+        self.rolloutRates.append(rollouts / max(elapsed, 1e-6))
+        return action
+
+    def getRoot(self, state, moveNumber, lastAction):
+        """
+        Returns the subtree of the move played after the last search, if
+        the tree is from the move before and the subtree is where Pacman
+        is, or a new root.
+        """
+        tree, treeMove = self.tree, self.treeMove
+        self.tree, self.treeMove = None, moveNumber
+        if tree != None and treeMove == moveNumber - 1:
+            tree = tree.children.get(lastAction)
+            if tree != None and tree.cell == state[rolloutPacman.PACMAN]:
+                self.tree = tree
+        if self.tree == None:
+            self.tree = MCTSNode(state[rolloutPacman.PACMAN])
+        return self.tree
+
+    def runRollouts(self, root, state, deadline, rng):
+        """
+        Grows the tree at root, the node of state, until deadline (or for
+        self.maxRollouts rollouts), drawing the ghost moves with rng.
+        Returns the number of rollouts.
+        """
+        engine = self.engine
+        rollouts = 0
+        while rollouts == 0 or (rollouts < self.maxRollouts if self.maxRollouts > 0 else time.time() < deadline):
+            rollouts += 1
+            current = engine.copyState(state)
+            node, path, action = root, [root], None
+            while current[rolloutPacman.RESULT] == rolloutPacman.PLAYING:
+                actions = engine.getLegalActions(current)
+                if len(node.children) < len(actions):
+                    untried = [action for action in actions if action not in node.children]
+                    action = untried[int(rng.random() * len(untried))]
+                    engine.move(current, action, rng)
+                    node.children[action] = MCTSNode(current[rolloutPacman.PACMAN])
+                    path.append(node.children[action])
+                    break
+                action = self.selectAction(node)
+                engine.move(current, action, rng)
+                node = node.children[action]
+                path.append(node)
+            score = engine.rollout(current, self.horizon, rng, action)
+            for node in path:
+                node.visits += 1
+                node.total += score
+        return rollouts
+
+    def selectAction(self, node):
+        "Returns the move of node with the highest upper confidence bound"
+        logVisits = math.log(node.visits)
+        bestValue, bestAction = None, None
+        for action, child in node.children.items():
+            value = child.total / child.visits + self.exploration * math.sqrt(logVisits / child.visits)
+            if bestValue == None or value > bestValue:
+                bestValue, bestAction = value, action
+        return bestAction
+
+    def startRolloutPool(self):
+        """
+        Forks the rollout workers, which keep the engine of the layout,
+        unless they are running.  Returns False if processes cannot fork
+        here, e.g. inside the worker of a parallel game.
+        """
+        global PARALLEL_ROLLOUTS
+        import multiprocessing
+        if self.pool != None:
+            return True
+        if multiprocessing.current_process().daemon:
+            return False
+        try:
+            context = multiprocessing.get_context('fork')
+        except ValueError:
+            return False
+        PARALLEL_ROLLOUTS = self
+        self.pool = context.Pool(self.workers)
+        return True
+
+    def stopRolloutPool(self):
+        if self.pool != None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def final(self, state):
+        """
+        Prints the rollouts per second of the game, and stops the rollout
+        workers.
+        """
+        rates = self.rolloutRates
+        if rates:
+            print('MCTS: %d rollouts in %d moves, %.1fs: %.0f rollouts/sec (per move min %.0f, max %.0f)' %
+                  (self.rolloutCount, len(rates), self.timeSpent, self.rolloutCount / max(self.timeSpent, 1e-6),
+                   min(rates), max(rates)))
+        self.stopRolloutPool()
+
+# The agent whose rollouts the rollout workers run
+PARALLEL_ROLLOUTS = None
+
+def searchRolloutTree(task):
+    """
+    Grows the tree of a rollout worker until the deadline, and returns the
+    (visits, total) of the root's moves and the number of rollouts.
+    """
+    state, moveNumber, lastAction, deadline, seed = task
+    agent = PARALLEL_ROLLOUTS
+    root = agent.getRoot(state, moveNumber, lastAction)
+    rollouts = agent.runRollouts(root, state, deadline, random.Random(seed))
+    return dict([(action, (child.visits, child.total)) for action, child in root.children.items()]), rollouts
 
 def betterEvaluationFunction(currentGameState: GameState):
     """
@@ -42,6 +42,10 @@ import autograder
 
 VERBOSE = False
 
+# The grading agents compare the number of distinct states a search
+# explores, which needs GameState to keep them all.
+GameState.setExploredMode(GameState.EXPLORED_FULL)
+
 
 class MultiagentTreeState(object):
     def __init__(self, problem, state):
@@ -495,6 +499,8 @@ class EvalAgentTest(testClasses.TestCase):
         self.maxPoints = sum([len(t) for t in [
                              self.scoreThresholds, self.nonTimeoutThresholds, self.winsThresholds]])
         self.agentArgs = testDict.get('agentArgs', '')
+        # Games are played in a pool of this many processes, if given
+        self.workers = int(testDict['workers']) if 'workers' in testDict else None
 
     def execute(self, grades, moduleDict, solutionDict):
         startTime = time.time()
@@ -510,7 +516,7 @@ class EvalAgentTest(testClasses.TestCase):
 
         random.seed(self.seed)
         games = pacman.runGames(lay, agent, self.ghosts, disp, self.numGames,
-                                False, catchExceptions=True, timeout=self.maxTime)
+                                False, catchExceptions=True, timeout=self.maxTime, workers=self.workers)
         totalTime = time.time() - startTime
 
         stats = {'time': totalTime, 'wins': [g.state.isWin() for g in games].count(True),
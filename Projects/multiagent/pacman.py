@@ -43,6 +43,7 @@ from game import GameStateData
 from game import Game
 from game import Directions
 from game import Actions
+from game import Configuration
 from util import nearestPoint
 from util import manhattanDistance
 import util
@@ -51,6 +52,7 @@ import sys
 import types
 import time
 import random
+import copy
 import os
 
 ###################################################
@@ -77,15 +79,47 @@ class GameState:
     # Accessor methods: use these to access state data #
     ####################################################
 
-    # static variable keeps track of which states have had getLegalActions called
+    # How generateSuccessor tracks the states it explores: not at all, by
+    # counting the successors it generates, or by keeping every parent and
+    # successor in a set (which the autograder needs, but which hashes each
+    # state and keeps it alive until the next reset).
+    EXPLORED_OFF = 'off'
+    EXPLORED_COUNT = 'count'
+    EXPLORED_FULL = 'full'
+    exploredMode = EXPLORED_COUNT
+
+    # static variables keep track of which states have been explored
     explored = set()
+    exploredCount = 0
+
+    def setExploredMode(mode):
+        if mode not in (GameState.EXPLORED_OFF, GameState.EXPLORED_COUNT, GameState.EXPLORED_FULL):
+            raise Exception('Unknown explored tracking mode: ' + str(mode))
+        GameState.exploredMode = mode
+        GameState.getAndResetExplored()
+    setExploredMode = staticmethod(setExploredMode)
 
     def getAndResetExplored():
-        tmp = GameState.explored.copy()
+        """
+        Returns the set of states explored since the last reset.  It stays
+        empty unless the mode is EXPLORED_FULL.
+        """
+        tmp = GameState.explored
         GameState.explored = set()
+        GameState.exploredCount = 0
         return tmp
     getAndResetExplored = staticmethod(getAndResetExplored)
 
+    def getAndResetExploredCount():
+        """
+        Returns the number of successors generated since the last reset,
+        unless the mode is EXPLORED_OFF.
+        """
+        count = GameState.exploredCount
+        GameState.getAndResetExplored()
+        return count
+    getAndResetExploredCount = staticmethod(getAndResetExploredCount)
+
     def getLegalActions(self, agentIndex=0):
         """
         Returns the legal actions for the agent specified.
@@ -112,7 +146,8 @@ class GameState:
 
         # Let agent's logic deal with its action's effects on the board
         if agentIndex == 0:  # Pacman is moving
-            state.data._eaten = [False for i in range(state.getNumAgents())]
+            if True in state.data._eaten:
+                state.data._eaten = [False for i in range(state.getNumAgents())]
             PacmanRules.applyAction(state, action)
         else:                # A ghost is moving
             GhostRules.applyAction(state, action, agentIndex)
@@ -121,7 +156,8 @@ class GameState:
         if agentIndex == 0:
             state.data.scoreChange += -TIME_PENALTY  # Penalty for waiting around
         else:
-            GhostRules.decrementTimer(state.data.agentStates[agentIndex])
+            GhostRules.decrementTimer(
+                state.data.getMutableAgentState(agentIndex))
 
         # Resolve multi-agent effects
         GhostRules.checkDeath(state, agentIndex)
@@ -129,8 +165,11 @@ class GameState:
         # Book keeping
         state.data._agentMoved = agentIndex
         state.data.score += state.data.scoreChange
-        GameState.explored.add(self)
-        GameState.explored.add(state)
+        if GameState.exploredMode != GameState.EXPLORED_OFF:
+            GameState.exploredCount += 1
+            if GameState.exploredMode == GameState.EXPLORED_FULL:
+                GameState.explored.add(self)
+                GameState.explored.add(state)
         return state
 
     def getLegalPacmanActions(self):
@@ -155,11 +194,15 @@ class GameState:
         return self.data.agentStates[0].getPosition()
 
     def getGhostStates(self):
+        if self.data._readOnly:
+            return [s.copy() for s in self.data.agentStates[1:]]
         return self.data.agentStates[1:]
 
     def getGhostState(self, agentIndex):
         if agentIndex == 0 or agentIndex >= self.getNumAgents():
             raise Exception("Invalid index passed to getGhostState")
+        if self.data._readOnly:
+            return self.data.agentStates[agentIndex].copy()
         return self.data.agentStates[agentIndex]
 
     def getGhostPosition(self, agentIndex):
@@ -168,7 +211,7 @@ class GameState:
         return self.data.agentStates[agentIndex].getPosition()
 
     def getGhostPositions(self):
-        return [s.getPosition() for s in self.getGhostStates()]
+        return [s.getPosition() for s in self.data.agentStates[1:]]
 
     def getNumAgents(self):
         return len(self.data.agentStates)
@@ -180,6 +223,8 @@ class GameState:
         """
         Returns a list of positions (x,y) of the remaining capsules.
         """
+        if self.data._readOnly:
+            return self.data.capsules[:]
         return self.data.capsules
 
     def getNumFood(self):
@@ -195,6 +240,8 @@ class GameState:
         currentFood = state.getFood()
         if currentFood[x][y] == True: ...
         """
+        if self.data._readOnly:
+            return self.data.food.copy()
         return self.data.food
 
     def getWalls(self):
@@ -235,6 +282,20 @@ class GameState:
         else:
             self.data = GameStateData()
 
+    def getReadOnlyView(self):
+        """
+        Returns a view of this state that shares its food, capsules, agent
+        states and layout rather than copying them.  Views answer every
+        accessor and generateSuccessor like the state itself, but getFood,
+        getCapsules and getGhostState(s) of a view return copies, and its
+        successors start with copies of them, so that changing them cannot
+        change this state.  The walls are shared, as the rules never change
+        them.  Use deepCopy for a state you can change.
+        """
+        state = GameState.__new__(GameState)
+        state.data = self.data.view()
+        return state
+
     def deepCopy(self):
         state = GameState(self)
         state.data = self.data.deepCopy()
@@ -252,6 +313,12 @@ class GameState:
         """
         return hash(self.data)
 
+    def zobristHash(self):
+        """
+        Returns a 64-bit hash of the state, for transposition tables.
+        """
+        return self.data.zobristHash()
+
     def __str__(self):
 
         return str(self.data)
@@ -359,7 +426,7 @@ class PacmanRules:
         if action not in legal:
             raise Exception("Illegal action " + str(action))
 
-        pacmanState = state.data.agentStates[0]
+        pacmanState = state.data.getMutableAgentState(0)
 
         # Update Configuration
         vector = Actions.directionToVector(action, PacmanRules.PACMAN_SPEED)
@@ -381,6 +448,7 @@ class PacmanRules:
             state.data.scoreChange += 10
             state.data.food = state.data.food.copy()
             state.data.food[x][y] = False
+            state.data._zobrist ^= GameStateData.foodKey(position)
             state.data._foodEaten = position
             # TODO: cache numFood?
             numFood = state.getNumFood()
@@ -388,12 +456,14 @@ class PacmanRules:
                 state.data.scoreChange += 500
                 state.data._win = True
         # Eat capsule
-        if(position in state.getCapsules()):
-            state.data.capsules.remove(position)
+        if(position in state.data.capsules):
+            state.data.getMutableCapsules().remove(position)
+            state.data._zobrist ^= GameStateData.capsuleKey(position)
             state.data._capsuleEaten = position
             # Reset all ghosts' scared timers
             for index in range(1, len(state.data.agentStates)):
-                state.data.agentStates[index].scaredTimer = SCARED_TIME
+                state.data.getMutableAgentState(
+                    index).scaredTimer = SCARED_TIME
     consume = staticmethod(consume)
 
 
@@ -408,7 +478,7 @@ class GhostRules:
         Ghosts cannot stop, and cannot turn around unless they
         reach a dead end, but can turn 90 degrees at intersections.
         """
-        conf = state.getGhostState(ghostIndex).configuration
+        conf = state.data.agentStates[ghostIndex].configuration
         possibleActions = Actions.getPossibleActions(
             conf, state.data.layout.walls)
         reverse = Actions.reverseDirection(conf.direction)
@@ -425,7 +495,7 @@ class GhostRules:
         if action not in legal:
             raise Exception("Illegal ghost action " + str(action))
 
-        ghostState = state.data.agentStates[ghostIndex]
+        ghostState = state.data.getMutableAgentState(ghostIndex)
         speed = GhostRules.GHOST_SPEED
         if ghostState.scaredTimer > 0:
             speed /= 2.0
@@ -437,8 +507,9 @@ class GhostRules:
     def decrementTimer(ghostState):
         timer = ghostState.scaredTimer
         if timer == 1:
-            ghostState.configuration.pos = nearestPoint(
-                ghostState.configuration.pos)
+            # Configurations are shared between states, so replace it
+            ghostState.configuration = Configuration(nearestPoint(
+                ghostState.configuration.pos), ghostState.configuration.direction)
         ghostState.scaredTimer = max(0, timer - 1)
     decrementTimer = staticmethod(decrementTimer)
 
@@ -460,9 +531,11 @@ class GhostRules:
     def collide(state, ghostState, agentIndex):
         if ghostState.scaredTimer > 0:
             state.data.scoreChange += 200
+            ghostState = state.data.getMutableAgentState(agentIndex)
             GhostRules.placeGhost(state, ghostState)
             ghostState.scaredTimer = 0
             # Added for first-person
+            state.data._eaten = state.data._eaten[:]
             state.data._eaten[agentIndex] = True
         else:
             if not state.data._win:
@@ -554,6 +627,9 @@ def readCommand(argv):
                       help='Turns on exception handling and timeouts during games', default=False)
     parser.add_option('--timeout', dest='timeout', type='int',
                       help=default('Maximum length of time an agent can spend computing in a single game'), default=30)
+    parser.add_option('--workers', dest='workers', type='int',
+                      help='Plays the games in a pool of WORKERS processes, without graphics, seeding each game from the random seed',
+                      metavar='WORKERS', default=None)
 
     options, otherjunk = parser.parse_args(argv)
     if len(otherjunk) != 0:
@@ -606,6 +682,7 @@ def readCommand(argv):
     args['record'] = options.record
     args['catchExceptions'] = options.catchExceptions
     args['timeout'] = options.timeout
+    args['workers'] = options.workers
 
     # Special case: recorded games don't use the runGames method or args structure
     if options.gameToReplay != None:
@@ -672,13 +749,87 @@ def replayGame(layout, actions, display):
     display.finish()
 
 
-def runGames(layout, pacman, ghosts, display, numGames, record, numTraining=0, catchExceptions=False, timeout=30):
+# The Game attributes a worker process sends back for each game it plays
+GAME_RESULTS = ['state', 'moveHistory', 'numMoves', 'gameOver', 'agentCrashed',
+                'agentTimeout', 'totalAgentTimes', 'totalAgentTimeWarnings']
+
+# The layout, agents and options of the games played by worker processes,
+# which forked workers inherit instead of receiving them pickled
+PARALLEL_GAMES = None
+
+
+def getGameSeeds(seed, numGames):
+    """
+    Returns the seeds of numGames games, derived from a master seed (or
+    from a draw from random if the seed is None).
+    """
+    if seed == None:
+        seed = random.getrandbits(64)
+    seeds = random.Random(seed)
+    return [seeds.getrandbits(64) for i in range(numGames)]
+
+
+def playGame(rules, layout, pacman, ghosts, display, quiet, catchExceptions, seed=None):
+    """
+    Plays one game.  Given a seed, the game reseeds random and is played by
+    copies of the agents, so it does not depend on the games before it.
+    """
+    if seed != None:
+        random.seed(seed)
+        pacman, ghosts = copy.deepcopy((pacman, ghosts))
+    game = rules.newGame(layout, pacman, ghosts,
+                         display, quiet, catchExceptions)
+    game.run()
+    return game
+
+
+def playParallelGame(seed):
+    "Plays the game with the given seed in a worker process"
+    import textDisplay
+    layout, pacman, ghosts, catchExceptions, timeout = PARALLEL_GAMES
+    game = playGame(ClassicGameRules(timeout), layout, pacman, ghosts,
+                    textDisplay.NullGraphics(), True, catchExceptions, seed)
+    return dict([(name, getattr(game, name)) for name in GAME_RESULTS])
+
+
+def startParallelGames(workers, layout, pacman, ghosts, catchExceptions, timeout, seeds):
+    """
+    Starts playing the games with the given seeds in a pool of forked
+    worker processes.  Returns the pool and an iterator over the results,
+    in the order of the seeds, or (None, None) if processes cannot fork.
+    """
+    global PARALLEL_GAMES
+    import multiprocessing
+    try:
+        context = multiprocessing.get_context('fork')
+    except ValueError:
+        return None, None
+    PARALLEL_GAMES = (layout, pacman, ghosts, catchExceptions, timeout)
+    pool = context.Pool(workers)
+    return pool, pool.imap(playParallelGame, seeds)
+
+
+def runGames(layout, pacman, ghosts, display, numGames, record, numTraining=0, catchExceptions=False, timeout=30, workers=None, seed=None):
+    """
+    Plays numGames games and returns the ones after the numTraining
+    training games.
+
+    Given a number of workers, every game first reseeds random from a master
+    seed (seed, or a draw from random), and games after the training games
+    are played by fresh copies of the agents, so their results do not depend
+    on the number of workers.  With more than one worker those games are
+    played without graphics in a pool of worker processes.
+    """
     import __main__
     __main__.__dict__['_display'] = display
 
     rules = ClassicGameRules(timeout)
     games = []
 
+    if workers != None:
+        gameSeeds = getGameSeeds(seed, numGames)
+    pool = results = None
+
     for i in range(numGames):
         beQuiet = i < numTraining
         if beQuiet:
@@ -689,9 +840,28 @@ def runGames(layout, pacman, ghosts, display, numGames, record, numTraining=0, c
         else:
             gameDisplay = display
             rules.quiet = False
-        game = rules.newGame(layout, pacman, ghosts,
-                             gameDisplay, beQuiet, catchExceptions)
-        game.run()
+        if workers == None:
+            game = playGame(rules, layout, pacman, ghosts,
+                            gameDisplay, beQuiet, catchExceptions)
+        elif beQuiet:
+            random.seed(gameSeeds[i])
+            game = playGame(rules, layout, pacman, ghosts,
+                            gameDisplay, beQuiet, catchExceptions)
+        else:
+            if workers > 1 and pool == None:
+                pool, results = startParallelGames(workers, layout, pacman, ghosts,
+                                                   catchExceptions, timeout, gameSeeds[i:])
+                workers = workers if pool != None else 1
+            if results != None:
+                # Stand the worker's game in for a game of these agents
+                game = rules.newGame(layout, pacman, ghosts,
+                                     gameDisplay, beQuiet, catchExceptions)
+                for name, value in next(results).items():
+                    setattr(game, name, value)
+                rules.process(game.state, game)
+            else:
+                game = playGame(rules, layout, pacman, ghosts,
+                                gameDisplay, beQuiet, catchExceptions, gameSeeds[i])
         if not beQuiet:
             games.append(game)
 
@@ -705,6 +875,10 @@ def runGames(layout, pacman, ghosts, display, numGames, record, numTraining=0, c
             pickle.dump(components, f)
             f.close()
 
+    if pool != None:
+        pool.close()
+        pool.join()
+
     if (numGames-numTraining) > 0:
         scores = [game.state.getScore() for game in games]
         wins = [game.state.isWin() for game in games]
@@ -0,0 +1,218 @@
+# rolloutPacman.py
+# ----------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+RolloutEngine plays quick, approximate games of classic Pacman from a
+GameState, for Monte Carlo search (see MCTSAgent in multiAgents.py).
+
+A rollout state is a short list of ints: cells are x * height + y, and
+food and capsules are bitboards with bit cell set where there is one.
+Scoring, eating, scared ghosts and deaths follow ClassicGameRules, with
+ghosts that move like RandomGhost.  It is approximate where that keeps
+it simple: ghosts are always on a cell (scared ghosts move every other
+turn instead of at half speed) and only collide on the same cell.
+
+> python rolloutPacman.py -l mediumClassic -n 2000
+"""
+
+from game import Directions
+from game import Actions
+import layout as layouts
+import pacman
+import random
+import sys
+import time
+
+# The fields of a rollout state
+PACMAN, FOOD, CAPSULES, NUM_FOOD, SCORE, RESULT, GHOSTS, GHOST_DIRECTIONS, SCARED, GHOST_STARTS = list(range(10))
+
+# Values of state[RESULT]
+PLAYING, WON, LOST = 0, 1, -1
+
+
+class RolloutEngine:
+    """
+    The move tables of a layout, and the rules of the rollouts played on it.
+    """
+
+    def __init__(self, layout):
+        self.width, self.height = layout.width, layout.height
+        table = layout.getMoveTable()
+        size = self.width * self.height
+        # For every open cell: the legal actions, the cell each of them
+        # leads to, the (action, cell) pairs of the moves (Stop left out),
+        # and the bitboard of the cell and its neighbors
+        self.actions = [()] * size
+        self.nextCells = [None] * size
+        self.moves = [()] * size
+        self.near = [0] * size
+        for position, actions in table.actions.items():
+            cell = self.getCell(position)
+            self.actions[cell] = actions
+            self.nextCells[cell] = dict([(action, self.getCell(Actions.getSuccessor(position, action)))
+                                         for action in actions])
+            self.moves[cell] = tuple([(action, self.nextCells[cell][action])
+                                      for action in actions if action != Directions.STOP])
+            for neighbor in table.neighbors[position]:
+                self.near[cell] |= 1 << self.getCell(neighbor)
+
+    def getCell(self, position):
+        "Returns the cell of the grid point nearest to position"
+        x, y = position
+        return int(x + 0.5) * self.height + int(y + 0.5)
+
+    def getState(self, gameState):
+        "Returns the rollout state of gameState"
+        capsules = 0
+        for position in gameState.getCapsules():
+            capsules |= 1 << self.getCell(position)
+        ghostStates = gameState.getGhostStates()
+        result = WON if gameState.isWin() else LOST if gameState.isLose() else PLAYING
+        return [self.getCell(gameState.getPacmanPosition()), gameState.getFood().asBits(), capsules,
+                gameState.getNumFood(), gameState.getScore(), result,
+                [self.getCell(ghost.getPosition()) for ghost in ghostStates],
+                [ghost.getDirection() for ghost in ghostStates],
+                [ghost.scaredTimer for ghost in ghostStates],
+                [self.getCell(ghost.start.getPosition()) for ghost in ghostStates]]
+
+    def copyState(self, state):
+        copy = state[:]
+        copy[GHOSTS], copy[GHOST_DIRECTIONS], copy[SCARED] = state[GHOSTS][:], state[GHOST_DIRECTIONS][:], state[SCARED][:]
+        return copy
+
+    def getLegalActions(self, state):
+        "Returns Pacman's legal actions, in the order GameState gives them"
+        return self.actions[state[PACMAN]]
+
+    def move(self, state, action, rng):
+        """
+        Plays action for Pacman and then a move of each ghost, drawn with
+        rng, changing state in place.
+        """
+        cell = self.nextCells[state[PACMAN]][action]
+        state[PACMAN] = cell
+        state[SCORE] -= pacman.TIME_PENALTY
+        bit = 1 << cell
+        if state[FOOD] & bit:
+            state[FOOD] ^= bit
+            state[NUM_FOOD] -= 1
+            state[SCORE] += 10
+            if state[NUM_FOOD] == 0:
+                state[SCORE] += 500
+                state[RESULT] = WON
+                return
+        if state[CAPSULES] & bit:
+            state[CAPSULES] ^= bit
+            state[SCARED] = [pacman.SCARED_TIME] * len(state[SCARED])
+        ghosts, directions, scared = state[GHOSTS], state[GHOST_DIRECTIONS], state[SCARED]
+        for i in range(len(ghosts)):
+            if ghosts[i] == cell and self.collide(state, i):
+                return
+        for i in range(len(ghosts)):
+            timer = scared[i]
+            if timer == 0 or timer % 2:
+                moves = self.moves[ghosts[i]]
+                reverse = Directions.REVERSE[directions[i]]
+                if len(moves) > 1:
+                    moves = [move for move in moves if move[0] != reverse]
+                directions[i], ghosts[i] = moves[int(rng.random() * len(moves))]
+            if timer:
+                scared[i] = timer - 1
+            if ghosts[i] == cell and self.collide(state, i):
+                return
+
+    def collide(self, state, ghost):
+        """
+        Pacman and ghost are on the same cell: Pacman eats a scared ghost,
+        and otherwise loses.  Returns whether the game is over.
+        """
+        if state[SCARED][ghost]:
+            state[SCORE] += 200
+            state[GHOSTS][ghost] = state[GHOST_STARTS][ghost]
+            state[GHOST_DIRECTIONS][ghost] = Directions.STOP
+            state[SCARED][ghost] = 0
+            return False
+        state[SCORE] -= 500
+        state[RESULT] = LOST
+        return True
+
+    def getRolloutAction(self, state, lastAction, rng):
+        """
+        The rollout policy: Pacman keeps going rather than turning back,
+        keeps off the cells next to ghosts that are not scared, and eats
+        food when it can, choosing at random otherwise.
+        """
+        moves = self.moves[state[PACMAN]]
+        if len(moves) > 1 and lastAction != None:
+            reverse = Directions.REVERSE[lastAction]
+            moves = [move for move in moves if move[0] != reverse]
+        danger = 0
+        ghosts, scared = state[GHOSTS], state[SCARED]
+        for i in range(len(ghosts)):
+            if not scared[i]:
+                danger |= self.near[ghosts[i]]
+        safe = [move for move in moves if not danger >> move[1] & 1] or moves
+        food = state[FOOD] | state[CAPSULES]
+        eating = [move for move in safe if food >> move[1] & 1] or safe
+        return eating[int(rng.random() * len(eating))][0]
+
+    def rollout(self, state, maxMoves, rng, lastAction=None):
+        """
+        Plays up to maxMoves moves of the rollout policy from state, in
+        place, and returns the final score.
+        """
+        for i in range(maxMoves):
+            if state[RESULT] != PLAYING:
+                break
+            lastAction = self.getRolloutAction(state, lastAction, rng)
+            self.move(state, lastAction, rng)
+        return state[SCORE]
+
+
+def measureRollouts(layoutName, numRollouts, maxMoves, seed):
+    "Returns the rollouts per second from the start of the layout"
+    lay = layouts.getLayout(layoutName)
+    gameState = pacman.GameState()
+    gameState.initialize(lay, lay.getNumGhosts())
+    engine = RolloutEngine(lay)
+    start = engine.getState(gameState)
+    rng = random.Random(seed)
+    began = time.time()
+    for i in range(numRollouts):
+        engine.rollout(engine.copyState(start), maxMoves, rng)
+    return numRollouts / (time.time() - began)
+
+
+def readCommand(argv):
+    from optparse import OptionParser
+    parser = OptionParser(__doc__)
+    parser.add_option('-l', '--layout', dest='layout', default='mediumClassic',
+                      help='the layout to play rollouts on [Default: %default]')
+    parser.add_option('-n', '--numRollouts', dest='numRollouts', type='int', default=2000,
+                      help='the number of rollouts to time [Default: %default]')
+    parser.add_option('-m', '--maxMoves', dest='maxMoves', type='int', default=20,
+                      help='the number of moves in a rollout [Default: %default]')
+    parser.add_option('-s', '--seed', dest='seed', type='int', default=0,
+                      help='the seed of the rollouts [Default: %default]')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    return options
+
+
+if __name__ == '__main__':
+    options = readCommand(sys.argv[1:])
+    rate = measureRollouts(options.layout, options.numRollouts, options.maxMoves, options.seed)
+    print('%d rollouts of %d moves on %s: %.0f rollouts/sec' %
+          (options.numRollouts, options.maxMoves, options.layout, rate))
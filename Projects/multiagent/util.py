@@ -233,6 +233,74 @@ class PriorityQueueWithFunction(PriorityQueue):
         PriorityQueue.push(self, item, self.priorityFunction(item))
 
 
+class TranspositionTable:
+    """
+    A bounded table of adversarial search results, keyed by (hashable) state
+    keys such as a GameState's Zobrist hash.  Each entry holds the value of a
+    state searched to some depth, whether that value is EXACT or only a
+    LOWER or UPPER bound (after an alpha-beta cutoff), and the best move
+    found.
+
+    The table has a fixed number of slots and each key maps to one of them.
+    A new entry replaces the one in its slot if that entry was stored during
+    an earlier search (see newSearch) or was searched no deeper, so entries
+    from deep, current searches survive longest.
+    """
+    EXACT, LOWER, UPPER = 0, 1, 2
+
+    def __init__(self, size=1 << 16):
+        self.size = size
+        self.slots = [None] * size  # (key, value, depth, bound, move, age)
+        self.age = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.replacements = 0
+
+    def newSearch(self):
+        """
+        Marks the start of a new search: entries stored so far become
+        replaceable regardless of their depth.
+        """
+        self.age += 1
+
+    def lookup(self, key):
+        """
+        Returns (value, depth, bound, move) stored for key, or None
+        """
+        self.probes += 1
+        slot = self.slots[hash(key) % self.size]
+        if slot == None or slot[0] != key:
+            return None
+        self.hits += 1
+        return slot[1:5]
+
+    def store(self, key, value, depth, bound, move=None):
+        index = hash(key) % self.size
+        slot = self.slots[index]
+        if slot != None and slot[0] != key and slot[5] == self.age and slot[2] > depth:
+            return
+        if slot != None and slot[0] != key:
+            self.replacements += 1
+        self.slots[index] = (key, value, depth, bound, move, self.age)
+        self.stores += 1
+
+    def clear(self):
+        self.slots = [None] * self.size
+
+    def __len__(self):
+        return self.size - self.slots.count(None)
+
+    def getStats(self):
+        """
+        Returns the probe, hit and store counts, the hit rate and how full
+        the table is
+        """
+        return {'probes': self.probes, 'hits': self.hits, 'stores': self.stores,
+                'replacements': self.replacements, 'entries': len(self), 'size': self.size,
+                'hitRate': self.hits / float(self.probes) if self.probes else 0.0}
+
+
 def manhattanDistance(xy1, xy2):
     "Returns the Manhattan distance between points xy1 and xy2"
     return abs(xy1[0] - xy2[0]) + abs(xy1[1] - xy2[1])
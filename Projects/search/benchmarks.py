@@ -0,0 +1,142 @@
+# benchmarks.py
+# -------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Microbenchmarks for the performance-sensitive parts of the search project.
+
+> python benchmarks.py                  (runs every benchmark)
+> python benchmarks.py -b distanceMap -l mediumMaze
+> python benchmarks.py -b packBits
+"""
+
+import sys
+import random
+import timeit
+import game
+import layout
+import pacman
+import search
+import searchAgents
+
+try:
+    import numpy
+    _NUMPY_ENABLED = True
+except ImportError:
+    _NUMPY_ENABLED = False
+
+def _best(statement, repeat, number):
+    "Returns the best time per call, in milliseconds"
+    return min(timeit.repeat(statement, repeat=repeat, number=number)) / number * 1000
+
+def benchmarkDistanceMap(layoutName, repeat=5):
+    """
+    Compares layout.getDistanceMap, which gives the distance from Pacman to
+    every cell at once, with a single search.bfs from Pacman to (1,1).
+    """
+    if not _NUMPY_ENABLED:
+        print('distanceMap on %s: skipped, getDistanceMap requires numpy' % layoutName)
+        return
+    lay = layout.getLayout(layoutName)
+    state = pacman.GameState()
+    state.initialize(lay, 0)
+    start = state.getPacmanPosition()
+
+    def bfs():
+        problem = searchAgents.PositionSearchProblem(state, start=start, goal=(1, 1), warn=False, visualize=False)
+        return search.bfs(problem)
+
+    distances = layout.getDistanceMap(lay.walls, start)
+    assert distances[1][1] == len(bfs()), 'distance map disagrees with bfs'
+
+    cells = len(lay.walls.asList(False))
+    print('distanceMap on %s (%d open cells)' % (layoutName, cells))
+    print('  search.bfs to (1,1):         %8.3f ms' % _best(bfs, repeat, 10))
+    print('  getDistanceMap (all cells):  %8.3f ms' % _best(lambda: layout.getDistanceMap(lay.walls, start), repeat, 10))
+    wallArray = numpy.array(lay.walls.data, dtype=bool)
+    print('  getDistanceMap, array walls: %8.3f ms' % _best(lambda: layout.getDistanceMap(wallArray, start), repeat, 10))
+
+def legacyPackBits(grid):
+    "The int tuple packing Grid.packBits used before the versioned format"
+    bits = [grid.width, grid.height]
+    currentInt = 0
+    for i in range(grid.height * grid.width):
+        bit = grid.CELLS_PER_INT - (i % grid.CELLS_PER_INT) - 1
+        x, y = i // grid.height, i % grid.height
+        if grid[x][y]:
+            currentInt += 2 ** bit
+        if (i + 1) % grid.CELLS_PER_INT == 0:
+            bits.append(currentInt)
+            currentInt = 0
+    bits.append(currentInt)
+    return tuple(bits)
+
+def legacyUnpackBits(bitRep):
+    "The cell by cell unpacking of the int tuple format"
+    width, height = bitRep[:2]
+    grid = game.Grid(width, height)
+    cell = 0
+    for packed in bitRep[2:]:
+        for i in range(grid.CELLS_PER_INT):
+            n = 2 ** (grid.CELLS_PER_INT - i - 1)
+            if cell < width * height:
+                grid[cell // height][cell % height] = packed >= n
+            if packed >= n:
+                packed -= n
+            cell += 1
+    return grid
+
+def benchmarkPackBits(layoutName, repeat=5):
+    """
+    Compares Grid.packBits and reconstituteGrid with the legacy int tuple
+    code, on a random 100x100 grid and on the food of the layout.
+    """
+    random.seed(0)
+    grid = game.Grid(100, 100)
+    for x in range(100):
+        for y in range(100):
+            grid[x][y] = random.random() < 0.5
+    food = layout.getLayout(layoutName).food
+    for name, g in (('100x100 Grid', grid), ('100x100 BitGrid', game.BitGrid.fromGrid(grid)), ('%s food BitGrid' % layoutName, food)):
+        legacy, packed = legacyPackBits(g), g.packBits()
+        assert legacyUnpackBits(legacy) == g and game.reconstituteGrid(legacy) == g
+        assert game.reconstituteGrid(packed) == g
+        timings = [_best(lambda: legacyPackBits(g), repeat, 5), _best(lambda: g.packBits(), repeat, 50),
+                   _best(lambda: legacyUnpackBits(legacy), repeat, 5), _best(lambda: game.reconstituteGrid(packed), repeat, 50)]
+        print('packBits on %s (%d bytes, was %d ints)' % (name, len(packed), len(legacy)))
+        print('  pack:   legacy %8.3f ms  packBits         %8.3f ms  (%5.0fx)' % (timings[0], timings[1], timings[0] / timings[1]))
+        print('  unpack: legacy %8.3f ms  reconstituteGrid %8.3f ms  (%5.0fx)' % (timings[2], timings[3], timings[2] / timings[3]))
+        print('  reconstituteGrid of the legacy tuple:      %8.3f ms' % _best(lambda: game.reconstituteGrid(legacy), repeat, 50))
+
+BENCHMARKS = {
+    'distanceMap': benchmarkDistanceMap,
+    'packBits': benchmarkPackBits,
+}
+
+def readCommand(argv):
+    from optparse import OptionParser
+    parser = OptionParser(__doc__)
+    parser.add_option('-b', '--benchmark', dest='benchmark', default=None,
+                      help='the benchmark to run: ' + ', '.join(sorted(BENCHMARKS)) + ' [Default: all]')
+    parser.add_option('-l', '--layout', dest='layout', default='bigMaze',
+                      help='the layout to benchmark on [Default: %default]')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    return options
+
+if __name__ == '__main__':
+    options = readCommand(sys.argv[1:])
+    names = [options.benchmark] if options.benchmark else sorted(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name](options.layout)
@@ -13,13 +13,217 @@
 
 
 from util import manhattanDistance
+from util import nearestPoint
 from game import Grid
+from game import BitGrid
+from game import Actions
 import os
+import sys
+import mmap
+import struct
+import hashlib
 import random
+from array import array
 from functools import reduce
 
+try:
+    import numpy
+    _NUMPY_ENABLED = True
+except ImportError:
+    _NUMPY_ENABLED = False
+
 VISIBILITY_MATRIX_CACHE = {}
 
+# All-pairs maze distances are cached in memory per wall pattern and on disk
+# in DISTANCE_CACHE_DIR, so that later runs on the same layout skip the BFS.
+DISTANCE_ORACLE_CACHE = {}
+DISTANCE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.distances')
+
+class DistanceOracle:
+    """
+    Maze distances between every pair of open cells of a layout, computed
+    once with a BFS from every cell and stored as a uint16 matrix.
+
+    The matrix is written to DISTANCE_CACHE_DIR under a hash of the layout's
+    walls and memory-mapped from there, so a second process on the same
+    layout starts without any precomputation and shares the pages with the
+    first.  If the cache cannot be written, the matrix is kept in memory.
+
+    Get one through Layout.getDistanceOracle().
+    """
+    UNREACHABLE = 0xFFFF
+    _MAGIC = b'PACDIST1'
+    _HEADER = struct.Struct('<8sI')
+
+    def __init__(self, walls, key, cacheDir=DISTANCE_CACHE_DIR):
+        self.cells = [(x, y) for x in range(walls.width)
+                      for y in range(walls.height) if not walls[x][y]]
+        self.index = dict((cell, i) for i, cell in enumerate(self.cells))
+        self.size = len(self.cells)
+        if self.size >= DistanceOracle.UNREACHABLE:
+            raise Exception('Layout too large for a uint16 distance matrix')
+        self.path = os.path.join(cacheDir, '%s-%s.dist' % (key, sys.byteorder))
+        self.distances = self._load()
+        if self.distances is None:
+            matrix = self._compute(walls)
+            if self._save(matrix):
+                self.distances = self._load()
+            if self.distances is None:
+                self.distances = matrix
+
+    def getDistance(self, pos1, pos2):
+        """
+        Returns the maze distance between two grid points, or UNREACHABLE
+        if there is no path between them.
+        """
+        return self.distances[self.index[pos1] * self.size + self.index[pos2]]
+
+    def getDistancesFrom(self, pos):
+        "Returns a {cell: distance} dictionary for every cell reachable from pos"
+        start = self.index[pos] * self.size
+        row = self.distances[start:start + self.size]
+        return dict((cell, d) for cell, d in zip(self.cells, row)
+                    if d != DistanceOracle.UNREACHABLE)
+
+    def _compute(self, walls):
+        size, index = self.size, self.index
+        neighbors = []
+        for x, y in self.cells:
+            neighbors.append([index[n] for n in ((x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y))
+                              if n in index])
+        matrix = array('H', [DistanceOracle.UNREACHABLE]) * (size * size)
+        for source in range(size):
+            row = source * size
+            matrix[row + source] = 0
+            layer, distance = [source], 0
+            while layer:
+                distance += 1
+                nextLayer = []
+                for cell in layer:
+                    for n in neighbors[cell]:
+                        if matrix[row + n] == DistanceOracle.UNREACHABLE:
+                            matrix[row + n] = distance
+                            nextLayer.append(n)
+                layer = nextLayer
+        return matrix
+
+    def _save(self, matrix):
+        "Writes the matrix to the cache; returns False if that is not possible"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # Written under a private name and renamed, so that concurrent
+            # runs never map a half-written file.
+            tmpPath = '%s.%d.tmp' % (self.path, os.getpid())
+            with open(tmpPath, 'wb') as f:
+                f.write(DistanceOracle._HEADER.pack(DistanceOracle._MAGIC, self.size))
+                matrix.tofile(f)
+            os.replace(tmpPath, self.path)
+            return True
+        except OSError:
+            return False
+
+    def _load(self):
+        "Memory-maps the cached matrix, or returns None if there is none"
+        try:
+            with open(self.path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        headerSize = DistanceOracle._HEADER.size
+        # A truncated or foreign file is a cache miss, and is replaced
+        if len(self._mmap) < headerSize:
+            return None
+        magic, size = DistanceOracle._HEADER.unpack_from(self._mmap)
+        if magic != DistanceOracle._MAGIC or size != self.size or \
+                len(self._mmap) != headerSize + 2 * size * size:
+            return None
+        return memoryview(self._mmap)[headerSize:].cast('H')
+
+def getDistanceMap(walls, source):
+    """
+    Returns the maze distance from source to every cell, as a (width, height)
+    numpy array indexed [x][y] like a Grid.  Walls and cells that cannot be
+    reached hold -1.
+
+    walls may be a Grid or a boolean numpy array of the same shape; passing
+    an array saves converting the Grid on every call.
+    """
+    return getMultiSourceDistanceMap(walls, [source])
+
+# The frontier size from which getMultiSourceDistanceMap expands a BFS step
+# with numpy rather than cell by cell
+WIDE_FRONTIER = 32
+
+def getMultiSourceDistanceMap(walls, sources):
+    """
+    Returns, for every cell, the maze distance to the nearest of the sources
+    (for instance every remaining food pellet), in the format described in
+    getDistanceMap.
+
+    The BFS is vectorized where that pays: a frontier of at least
+    WIDE_FRONTIER flat cell indices is expanded all at once through a table
+    of neighbours, so the Python loop runs once per distance rather than
+    once per cell.  Narrower frontiers, such as those of the corridors of a
+    maze, cost less to expand cell by cell than the numpy calls of a step,
+    so they are.  Both write the same buffers, through numpy views.
+    """
+    if not _NUMPY_ENABLED:
+        raise Exception('getMultiSourceDistanceMap requires numpy')
+    if isinstance(walls, Grid):
+        walls = walls.data
+    walls = numpy.asarray(walls, dtype=bool)
+    width, height = walls.shape
+
+    # Pad with a border of walls so that every open cell has four neighbours.
+    blocked = numpy.ones((width + 2, height + 2), dtype=bool)
+    blocked[1:-1, 1:-1] = walls
+    stride = height + 2
+    reachedBytes = bytearray(blocked.tobytes())
+    reached = numpy.frombuffer(reachedBytes, dtype=bool)
+    distanceInts = array('i', [-1]) * reached.size
+    distances = numpy.frombuffer(distanceInts, dtype=numpy.intc)
+    cells = numpy.arange(reached.size)
+    neighbors = numpy.stack([cells + 1, cells - 1, cells + stride, cells - stride], axis=1)
+    neighbors[reached] = 0      # never expanded; keeps the table in bounds
+    neighborLists = None
+    # Where the last write to each cell came from, to drop duplicates
+    owner = numpy.zeros(reached.size, dtype=numpy.intp)
+
+    frontier = []
+    for pos in sources:
+        x, y = nearestPoint(pos)
+        cell = (x + 1) * stride + y + 1
+        if not reachedBytes[cell]:
+            reachedBytes[cell] = True
+            distanceInts[cell] = 0
+            frontier.append(cell)
+
+    distance = 0
+    while len(frontier):
+        distance += 1
+        if len(frontier) >= WIDE_FRONTIER:
+            candidates = neighbors[frontier].ravel()
+            candidates = candidates[~reached[candidates]]
+            order = numpy.arange(candidates.size)
+            owner[candidates] = order
+            frontier = candidates[owner[candidates] == order]
+            reached[frontier] = True
+            distances[frontier] = distance
+        else:
+            if neighborLists == None:
+                neighborLists = neighbors.tolist()
+            nextFrontier = []
+            for cell in (frontier if isinstance(frontier, list) else frontier.tolist()):
+                for n in neighborLists[cell]:
+                    if not reachedBytes[n]:
+                        reachedBytes[n] = True
+                        distanceInts[n] = distance
+                        nextFrontier.append(n)
+            frontier = nextFrontier
+
+    return distances.reshape(width + 2, height + 2)[1:-1, 1:-1]
+
+
 class Layout:
     """
     A Layout manages the static information about the game board.
@@ -29,13 +233,15 @@ class Layout:
         self.width = len(layoutText[0])
         self.height= len(layoutText)
         self.walls = Grid(self.width, self.height, False)
-        self.food = Grid(self.width, self.height, False)
+        self.food = BitGrid(self.width, self.height, False)
         self.capsules = []
         self.agentPositions = []
         self.numGhosts = 0
         self.processLayoutText(layoutText)
         self.layoutText = layoutText
         self.totalFood = len(self.food.asList())
+        # The DISTANCE_ORACLE_CACHE key of the walls, once it is needed
+        self.wallsKey = None
         # self.initializeVisibilityMatrix()
 
     def getNumGhosts(self):
@@ -62,6 +268,26 @@ class Layout:
         else:
             self.visibility = VISIBILITY_MATRIX_CACHE[reduce(str.__add__, self.layoutText)]
 
+    def getDistanceOracle(self):
+        """
+        Returns the DistanceOracle for this layout's walls, building it (or
+        loading it from the on-disk cache) on first use.
+        """
+        key = self.wallsKey
+        if key == None:
+            wallText = '\n'.join(''.join('%' if c == '%' else ' ' for c in row)
+                                 for row in self.layoutText)
+            key = self.wallsKey = hashlib.sha1(wallText.encode()).hexdigest()
+        if key not in DISTANCE_ORACLE_CACHE:
+            DISTANCE_ORACLE_CACHE[key] = DistanceOracle(self.walls, key)
+        return DISTANCE_ORACLE_CACHE[key]
+
+    def getMoveTable(self):
+        """
+        Returns the MoveTable (see game.py) of this layout's walls.
+        """
+        return Actions.getMoveTable(self.walls)
+
     def isWall(self, pos):
         x, col = pos
         return self.walls[x][col]
@@ -91,7 +317,18 @@ class Layout:
         return "\n".join(self.layoutText)
 
     def deepCopy(self):
-        return Layout(self.layoutText[:])
+        """
+        Copies the grids and lists of the layout instead of parsing its
+        text again.
+        """
+        layout = Layout.__new__(Layout)
+        layout.__dict__.update(self.__dict__)
+        layout.walls = self.walls.deepCopy()
+        layout.food = self.food.deepCopy()
+        layout.capsules = self.capsules[:]
+        layout.agentPositions = self.agentPositions[:]
+        layout.layoutText = self.layoutText[:]
+        return layout
 
     def processLayoutText(self, layoutText):
         """
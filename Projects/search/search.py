@@ -18,6 +18,7 @@ Pacman agents (in searchAgents.py).
 """
 
 import util
+from array import array
 from game import Directions
 from typing import List
 
@@ -66,6 +67,57 @@ class SearchProblem:
 
 
 
+class SearchNodeStore:
+    """
+    The search tree shared by the search functions in this file.
+
+    Every node generated during a search is stored once, as an index into
+    three parallel arrays: the index of its parent node, the action that led
+    to it from the parent and its path cost g.  Frontier entries only carry a
+    node index, so pushing a successor costs O(1) instead of copying the
+    whole path; the list of actions is rebuilt once, from the goal node,
+    by following parent links.
+    """
+    ROOT = -1
+
+    def __init__(self):
+        self.parents = array('l')
+        self.actions = []
+        self.costs = array('d')
+
+    def __len__(self):
+        return len(self.actions)
+
+    def addRoot(self):
+        "Adds the node for the start state and returns its index"
+        return self.add(SearchNodeStore.ROOT, None, 0)
+
+    def add(self, parent, action, stepCost):
+        """
+        Adds the child of 'parent' reached with 'action' at a cost of
+        'stepCost' and returns its index.
+        """
+        g = stepCost if parent == SearchNodeStore.ROOT else self.costs[parent] + stepCost
+        self.parents.append(parent)
+        self.actions.append(action)
+        self.costs.append(g)
+        return len(self.actions) - 1
+
+    def getCost(self, node):
+        "Returns the path cost g of the node"
+        return self.costs[node]
+
+    def getPath(self, node):
+        "Returns the list of actions leading from the root to the node"
+        path = []
+        parents, actions = self.parents, self.actions
+        while parents[node] != SearchNodeStore.ROOT:
+            path.append(actions[node])
+            node = parents[node]
+        path.reverse()
+        return path
+
+
 def tinyMazeSearch(problem: SearchProblem) -> List[Directions]:
     """
     Returns a sequence of moves that solves tinyMaze.  For any other maze, the
@@ -97,23 +149,22 @@ def depthFirstSearch(problem: SearchProblem) -> List[Directions]:
     # Stores states that have already been expanded (successors generated).
     expanded_states = set()
 
-    # The stack will store tuples: (state, path_to_state_as_list_of_directions)
+    # The stack stores (state, node) pairs; the path to the state lives in
+    # the node store and is only rebuilt once the goal is popped.
+    nodes = SearchNodeStore()
     dfs_stack = util.Stack()
-
-    # Initial state and an empty path
-    start_state = problem.getStartState()
-    dfs_stack.push((start_state, []))
+    dfs_stack.push((problem.getStartState(), nodes.addRoot()))
 
     # --- 2. Main Search Loop ---
 
     while not dfs_stack.isEmpty():
 
-        # Pop the current state and its accumulated path
-        current_state, path_so_far = dfs_stack.pop()
+        # Pop the current state and its search node
+        current_state, node = dfs_stack.pop()
 
         # Check for Goal (should be done immediately upon popping a node)
         if problem.isGoalState(current_state):
-            return path_so_far
+            return nodes.getPath(node)
 
         # Graph Search Check: Skip if we've already expanded this state
         if current_state in expanded_states:
@@ -121,122 +172,89 @@ def depthFirstSearch(problem: SearchProblem) -> List[Directions]:
 
         # Mark the current state as expanded
         expanded_states.add(current_state)
-        # nodes_expanded += 1 # Uncomment if you need to track this metric
 
         # Get successors: (successor_state, direction, cost)
-        for successor_state, direction, _ in problem.getSuccessors(current_state):
-
-            # 1. Create a NEW path by copying the old path
-            new_path = path_so_far + [direction]  # Using list concatenation to create a new list
-
-            # 2. Check visited status of the successor state (Optimization)
+        for successor_state, direction, step_cost in problem.getSuccessors(current_state):
             if successor_state not in expanded_states:
-                # Push the successor state and the NEW path onto the stack
-                dfs_stack.push((successor_state, new_path))
+                dfs_stack.push((successor_state, nodes.add(node, direction, step_cost)))
 
     # If the stack is empty and the goal hasn't been found
     return []
-    #util.raiseNotDefined()
 
 def breadthFirstSearch(problem: SearchProblem) -> List[Directions]:
     """Search the shallowest nodes in the search tree first."""
     # --- 1. Initialization ---
 
-    # Use a set for O(1) average time complexity lookup of visited states.
     # Stores states that have already been expanded (successors generated).
     expanded_states = set()
 
-    # The stack will store tuples: (state, path_to_state_as_list_of_directions)
-    dfs_stack = util.Queue()
-
-    # Initial state and an empty path
-    start_state = problem.getStartState()
-    dfs_stack.push((start_state, []))
+    # The queue stores (state, node) pairs, see depthFirstSearch.
+    nodes = SearchNodeStore()
+    bfs_queue = util.Queue()
+    bfs_queue.push((problem.getStartState(), nodes.addRoot()))
 
     # --- 2. Main Search Loop ---
 
-    while not dfs_stack.isEmpty():
+    while not bfs_queue.isEmpty():
 
-        # Pop the current state and its accumulated path
-        current_state, path_so_far = dfs_stack.pop()
+        current_state, node = bfs_queue.pop()
 
-        # Check for Goal (should be done immediately upon popping a node)
         if problem.isGoalState(current_state):
-            return path_so_far
+            return nodes.getPath(node)
 
-        # Graph Search Check: Skip if we've already expanded this state
         if current_state in expanded_states:
-            print("i am stuck here in continue")
             continue
-
-        # Mark the current state as expanded
         expanded_states.add(current_state)
-        # nodes_expanded += 1 # Uncomment if you need to track this metric
 
-        # Get successors: (successor_state, direction, cost)
-        for successor_state, direction, _ in problem.getSuccessors(current_state):
-
-            # 1. Create a NEW path by copying the old path
-            new_path = path_so_far + [direction]  # Using list concatenation to create a new list
-
-            # 2. Check visited status of the successor state (Optimization)
+        for successor_state, direction, step_cost in problem.getSuccessors(current_state):
             if successor_state not in expanded_states:
-                # Push the successor state and the NEW path onto the stack
-                dfs_stack.push((successor_state, new_path))
-            print("i am stuck here in for loop")
+                bfs_queue.push((successor_state, nodes.add(node, direction, step_cost)))
 
-    # If the stack is empty and the goal hasn't been found
+    # If the queue is empty and the goal hasn't been found
     return []
 
 def uniformCostSearch(problem: SearchProblem) -> List[Directions]:
     """Search the node of least total cost first."""
-    """Search the shallowest nodes in the search tree first."""
     # --- 1. Initialization ---
 
-    # Use a set for O(1) average time complexity lookup of visited states.
     # Stores states that have already been expanded (successors generated).
     expanded_states = set()
 
-    # The stack will store tuples: (state, path_to_state_as_list_of_directions)
-    dfs_stack = util.PriorityQueue()
-
-    # Initial state and an empty path
+    # Each frontier state is queued once, keyed by its best known path cost;
+    # a cheaper path found later lowers the key in place instead of pushing
+    # a duplicate.  frontier_nodes maps each queued state to its best node.
+    # The bucket queue switches itself to a binary heap if a step cost is
+    # not a small integer.
+    nodes = SearchNodeStore()
     start_state = problem.getStartState()
-    dfs_stack.push((start_state, []),util.manhattanDistance(start_state,))
+    frontier_nodes = {start_state: nodes.addRoot()}
+    ucs_queue = util.BucketPriorityQueue()
+    ucs_queue.push(start_state, 0)
 
     # --- 2. Main Search Loop ---
 
-    while not dfs_stack.isEmpty():
+    while not ucs_queue.isEmpty():
 
-        # Pop the current state and its accumulated path
-        current_state, path_so_far = dfs_stack.pop()
+        current_state = ucs_queue.pop()
+        node = frontier_nodes.pop(current_state)
 
-        # Check for Goal (should be done immediately upon popping a node)
         if problem.isGoalState(current_state):
-            return path_so_far
-
-        # Graph Search Check: Skip if we've already expanded this state
-        if current_state in expanded_states:
-            print("i am stuck here in continue")
-            continue
+            return nodes.getPath(node)
 
-        # Mark the current state as expanded
         expanded_states.add(current_state)
-        # nodes_expanded += 1 # Uncomment if you need to track this metric
-
-        # Get successors: (successor_state, direction, cost)
-        for successor_state, direction, _ in problem.getSuccessors(current_state):
-
-            # 1. Create a NEW path by copying the old path
-            new_path = path_so_far + [direction]  # Using list concatenation to create a new list
 
-            # 2. Check visited status of the successor state (Optimization)
-            if successor_state not in expanded_states:
-                # Push the successor state and the NEW path onto the stack
-                dfs_stack.push((successor_state, new_path))
-            print("i am stuck here in for loop")
-
-    # If the stack is empty and the goal hasn't been found
+        for successor_state, direction, step_cost in problem.getSuccessors(current_state):
+            if successor_state in expanded_states:
+                continue
+            new_cost = nodes.getCost(node) + step_cost
+            if successor_state in ucs_queue:
+                if not ucs_queue.decreaseKey(successor_state, new_cost):
+                    continue
+            else:
+                ucs_queue.push(successor_state, new_cost)
+            frontier_nodes[successor_state] = nodes.add(node, direction, step_cost)
+
+    # If the queue is empty and the goal hasn't been found
     return []
 
 def nullHeuristic(state, problem=None) -> float:
@@ -246,13 +264,419 @@ def nullHeuristic(state, problem=None) -> float:
     """
     return 0
 
-def aStarSearch(problem: SearchProblem, heuristic=nullHeuristic) -> List[Directions]:
-    """Search the node that has the lowest combined cost and heuristic first."""
-    "*** YOUR CODE HERE ***"
-    util.raiseNotDefined()
+# Counters left behind by the last aStarSearch call, for comparing its
+# reopening and tie-breaking policies.
+searchStatistics = {}
+
+def aStarSearch(problem: SearchProblem, heuristic=nullHeuristic, mode='admissible', tieBreak='highG') -> List[Directions]:
+    """
+    Search the node that has the lowest combined cost and heuristic first.
+
+    Frontier entries are never updated in place: a cheaper path to a state
+    is pushed as a new entry and the stale ones are dropped when popped.
+
+      mode:     'admissible' (the default) only assumes an admissible
+                heuristic and reopens an expanded state when a cheaper path
+                to it turns up, which keeps the result optimal; with a
+                consistent heuristic that never happens.  'consistent'
+                never reopens, skipping the cheaper-path bookkeeping for
+                expanded states.
+      tieBreak: order between nodes of equal f = g + h: 'highG' (deepest
+                first, the default), 'lowG' or 'fifo'.
+
+    The counts of expanded, reopened and generated nodes are stored in
+    searchStatistics.
+    """
+    if mode not in ('consistent', 'admissible'):
+        raise ValueError('Unknown A* mode: ' + str(mode))
+    if tieBreak == 'highG':
+        priority = lambda f, g: (f, -g)
+    elif tieBreak == 'lowG':
+        priority = lambda f, g: (f, g)
+    elif tieBreak == 'fifo':
+        priority = lambda f, g: f
+    else:
+        raise ValueError('Unknown tie-breaking policy: ' + str(tieBreak))
+    reopen = mode == 'admissible'
+
+    # --- 1. Initialization ---
+
+    # best_g holds the cheapest path cost found so far for every generated
+    # state; a popped node whose g is above it is stale.  The heuristic is
+    # evaluated once per state.
+    nodes = SearchNodeStore()
+    node_states = []
+    best_g = {}
+    h_cache = {}
+    expanded_states = set()
+    expanded = reopened = 0
+
+    # Integer costs and heuristics get the bucket queue; anything else
+    # makes it fall back to a binary heap on its own.
+    astar_queue = util.BucketPriorityQueue()
+
+    start_state = problem.getStartState()
+    root = nodes.addRoot()
+    node_states.append(start_state)
+    best_g[start_state] = 0
+    h_cache[start_state] = heuristic(start_state, problem)
+    astar_queue.push(root, priority(h_cache[start_state], 0))
+
+    # --- 2. Main Search Loop ---
+
+    result = []
+    while not astar_queue.isEmpty():
+
+        node = astar_queue.pop()
+        current_state = node_states[node]
+        g = nodes.getCost(node)
+
+        # Lazy deletion: a cheaper path to this state was queued later
+        if g > best_g[current_state]:
+            continue
+
+        if problem.isGoalState(current_state):
+            result = nodes.getPath(node)
+            break
+
+        if current_state in expanded_states:
+            if not reopen:
+                continue
+            reopened += 1
+        expanded_states.add(current_state)
+        expanded += 1
+
+        for successor_state, direction, step_cost in problem.getSuccessors(current_state):
+            if not reopen and successor_state in expanded_states:
+                continue
+            new_g = g + step_cost
+            if successor_state in best_g and best_g[successor_state] <= new_g:
+                continue
+            best_g[successor_state] = new_g
+            if successor_state not in h_cache:
+                h_cache[successor_state] = heuristic(successor_state, problem)
+            child = nodes.add(node, direction, step_cost)
+            node_states.append(successor_state)
+            astar_queue.push(child, priority(new_g + h_cache[successor_state], new_g))
+
+    searchStatistics.clear()
+    searchStatistics.update(expanded=expanded, reopened=reopened, generated=len(nodes))
+    return result
+
+class ReverseSearchProblem(SearchProblem):
+    """
+    The backward half of a bidirectional search, seen as an ordinary search
+    problem.  It starts at the goal of a point-to-point problem, its
+    successors are the original problem's predecessors and its goal is the
+    original start state.
+
+    A point-to-point problem supports this by providing getGoalState() and
+    getPredecessors(state), which returns (predecessor, action, stepCost)
+    triples where 'action' leads from 'predecessor' to 'state'.
+
+    The 'goal' attribute lets position heuristics such as manhattanHeuristic
+    estimate the distance back to the start; any other attribute (walls,
+    heuristicInfo, ...) is read from the original problem.
+    """
+
+    def __init__(self, problem):
+        self.problem = problem
+        self.goal = problem.getStartState()
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+    def getStartState(self):
+        return self.problem.getGoalState()
+
+    def isGoalState(self, state):
+        return state == self.goal
+
+    def getSuccessors(self, state):
+        return self.problem.getPredecessors(state)
+
+def _joinPaths(forward_nodes, forward_node, backward_nodes, backward_node):
+    """
+    Joins a path from the start and a path from the goal that meet in the
+    same state.  Backward nodes store the action leading away from the goal
+    side, so that half is read in reverse.
+    """
+    backward_path = backward_nodes.getPath(backward_node)
+    backward_path.reverse()
+    return forward_nodes.getPath(forward_node) + backward_path
+
+def bidirectionalSearch(problem: SearchProblem) -> List[Directions]:
+    """
+    Breadth-first search from the start and from the goal at the same time,
+    for point-to-point problems that can be searched backwards (see
+    ReverseSearchProblem).  Each round expands one whole layer of the
+    smaller side; once a layer touches the other side the shortest of the
+    meeting paths found in that layer is returned.
+    """
+    start_state, goal_state = problem.getStartState(), problem.getGoalState()
+    if start_state == goal_state:
+        return []
+
+    # Per side: the node store, state -> node for every reached state, the
+    # layer to expand next and the problem to expand it with.  BFS ignores
+    # step costs, so nodes store a cost of 1 and getCost is the depth.
+    forward = [SearchNodeStore(), {}, [start_state], problem]
+    backward = [SearchNodeStore(), {}, [goal_state], ReverseSearchProblem(problem)]
+    forward[1][start_state] = forward[0].addRoot()
+    backward[1][goal_state] = backward[0].addRoot()
+
+    while forward[2] and backward[2]:
+        if len(forward[2]) <= len(backward[2]):
+            side, other = forward, backward
+        else:
+            side, other = backward, forward
+        nodes, reached, layer, side_problem = side
+        other_nodes, other_reached = other[0], other[1]
+
+        next_layer = []
+        best = None
+        for state in layer:
+            node = reached[state]
+            for successor_state, direction, _ in side_problem.getSuccessors(state):
+                if successor_state in reached:
+                    continue
+                child = nodes.add(node, direction, 1)
+                reached[successor_state] = child
+                next_layer.append(successor_state)
+                if successor_state in other_reached:
+                    other_node = other_reached[successor_state]
+                    length = nodes.getCost(child) + other_nodes.getCost(other_node)
+                    if best is None or length < best[0]:
+                        best = (length, child, other_node)
+        if best is not None:
+            _, node, other_node = best
+            if side is forward:
+                return _joinPaths(nodes, node, other_nodes, other_node)
+            return _joinPaths(other_nodes, other_node, nodes, node)
+        side[2] = next_layer
+
+    return []
+
+def bidirectionalAStarSearch(problem: SearchProblem, heuristic=nullHeuristic) -> List[Directions]:
+    """
+    A* from the start and from the goal at the same time, for point-to-point
+    problems that can be searched backwards (see ReverseSearchProblem).  The
+    backward search calls heuristic(state, reverseProblem), whose goal is
+    the start state.
+
+    mu is the cost of the cheapest start-to-goal path seen where the two
+    searches meet.  Each step pops from the side with the smaller frontier;
+    once the lowest f on either side reaches mu, no path through the
+    remaining frontier can be cheaper, so the search stops.  With an
+    admissible heuristic the result is optimal.
+    """
+    start_state, goal_state = problem.getStartState(), problem.getGoalState()
+    if start_state == goal_state:
+        return []
+
+    class Side:
+        def __init__(self, side_problem):
+            self.problem = side_problem
+            self.nodes = SearchNodeStore()
+            self.node_states = []
+            self.best_g = {}
+            self.best_node = {}
+            self.h_cache = {}
+            self.queue = util.PriorityQueue()
+
+        def push(self, state, node):
+            g = self.nodes.getCost(node)
+            self.best_g[state] = g
+            self.best_node[state] = node
+            if state not in self.h_cache:
+                self.h_cache[state] = heuristic(state, self.problem)
+            # Equal f values are broken toward higher g, as in aStarSearch.
+            self.queue.push(node, (g + self.h_cache[state], -g))
+
+    forward = Side(problem)
+    backward = Side(ReverseSearchProblem(problem))
+    for side, state in ((forward, start_state), (backward, goal_state)):
+        side.node_states.append(state)
+        side.push(state, side.nodes.addRoot())
+
+    mu = float('inf')
+    meeting = None
+    while not forward.queue.isEmpty() and not backward.queue.isEmpty():
+        if len(forward.queue.heap) <= len(backward.queue.heap):
+            side, other = forward, backward
+        else:
+            side, other = backward, forward
+
+        node = side.queue.pop()
+        state = side.node_states[node]
+        g = side.nodes.getCost(node)
+        if g > side.best_g[state]:
+            continue    # stale entry
+        if g + side.h_cache[state] >= mu:
+            break
+
+        for successor_state, direction, step_cost in side.problem.getSuccessors(state):
+            new_g = g + step_cost
+            if successor_state in side.best_g and side.best_g[successor_state] <= new_g:
+                continue
+            child = side.nodes.add(node, direction, step_cost)
+            side.node_states.append(successor_state)
+            side.push(successor_state, child)
+            if successor_state in other.best_g and new_g + other.best_g[successor_state] < mu:
+                mu = new_g + other.best_g[successor_state]
+                meeting = (side, child, other.best_node[successor_state])
+
+    if meeting is None:
+        return []
+    side, node, other_node = meeting
+    if side is forward:
+        return _joinPaths(forward.nodes, node, backward.nodes, other_node)
+    return _joinPaths(forward.nodes, other_node, backward.nodes, node)
+
+def jumpPointPath(walls, start, goal) -> List[Directions]:
+    """
+    Returns a shortest list of actions from start to goal in a 4-connected
+    grid with unit step costs, given its walls Grid, or [] if the goal
+    cannot be reached.
+
+    This is Jump Point Search for grids without diagonal moves: instead of
+    expanding every cell, A* only expands jump points.  A horizontal jump
+    stops at a cell with a forced neighbour above or below (an opening that
+    was a wall one step back); a vertical jump also stops at every cell from
+    which a horizontal jump would find something.  Expanded jump points are
+    counted in searchStatistics['expanded'].
+    """
+    width, height = walls.width, walls.height
+
+    def blocked(x, y):
+        return x < 0 or y < 0 or x >= width or y >= height or walls[x][y]
+
+    def jumpHorizontally(x, y, dx):
+        while not blocked(x, y):
+            if (x, y) == goal:
+                return True
+            if (not blocked(x, y - 1) and blocked(x - dx, y - 1)) or \
+                    (not blocked(x, y + 1) and blocked(x - dx, y + 1)):
+                return True
+            x += dx
+        return False
+
+    def jump(x, y, dx, dy):
+        "Returns the first jump point going from (x,y) in direction (dx,dy)"
+        while not blocked(x, y):
+            if (x, y) == goal:
+                return (x, y)
+            if dx:
+                if (not blocked(x, y - 1) and blocked(x - dx, y - 1)) or \
+                        (not blocked(x, y + 1) and blocked(x - dx, y + 1)):
+                    return (x, y)
+            else:
+                if (not blocked(x - 1, y) and blocked(x - 1, y - dy)) or \
+                        (not blocked(x + 1, y) and blocked(x + 1, y - dy)):
+                    return (x, y)
+                if jumpHorizontally(x + 1, y, 1) or jumpHorizontally(x - 1, y, -1):
+                    return (x, y)
+            x += dx
+            y += dy
+        return None
+
+    def heuristic(point):
+        return abs(point[0] - goal[0]) + abs(point[1] - goal[1])
+
+    # A* over jump points, with lazy deletion as in aStarSearch.  parents
+    # maps each jump point to the one it was reached from.
+    best_g = {start: 0}
+    parents = {start: None}
+    expanded = 0
+    queue = util.PriorityQueue()
+    queue.push((start, 0), (heuristic(start), 0))
+    found = False
+    while not queue.isEmpty():
+        point, g = queue.pop()
+        if g > best_g[point]:
+            continue
+        if point == goal:
+            found = True
+            break
+        expanded += 1
+
+        x, y = point
+        parent = parents[point]
+        if parent is None:
+            directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+        else:
+            # Only the natural and forced neighbours of the travel direction
+            dx = (x > parent[0]) - (x < parent[0])
+            dy = (y > parent[1]) - (y < parent[1])
+            if dx:
+                directions = [(dx, 0), (0, 1), (0, -1)]
+            else:
+                directions = [(0, dy), (1, 0), (-1, 0)]
+
+        for dx, dy in directions:
+            successor = jump(x + dx, y + dy, dx, dy)
+            if successor is None:
+                continue
+            new_g = g + abs(successor[0] - x) + abs(successor[1] - y)
+            if successor in best_g and best_g[successor] <= new_g:
+                continue
+            best_g[successor] = new_g
+            parents[successor] = point
+            queue.push((successor, new_g), (new_g + heuristic(successor), -new_g))
+
+    searchStatistics.clear()
+    searchStatistics.update(expanded=expanded, generated=len(best_g))
+    if not found:
+        return []
+
+    # Turn the chain of jump points into single steps
+    points = []
+    point = goal
+    while point is not None:
+        points.append(point)
+        point = parents[point]
+    points.reverse()
+    path = []
+    for (x1, y1), (x2, y2) in zip(points, points[1:]):
+        if x2 != x1:
+            path.extend([Directions.EAST if x2 > x1 else Directions.WEST] * abs(x2 - x1))
+        else:
+            path.extend([Directions.NORTH if y2 > y1 else Directions.SOUTH] * abs(y2 - y1))
+    return path
+
+def jumpPointSearch(problem: SearchProblem) -> List[Directions]:
+    """
+    Jump Point Search for point-to-point grid problems such as
+    PositionSearchProblem: the problem must provide 'walls', getGoalState()
+    and a 'costFn' giving the cost of entering a cell.
+
+    JPS is only correct when every step costs the same, so the cost function
+    is first evaluated on every open cell.  Non-uniform costs (or a problem
+    that is not a grid) fall back to aStarSearch, with the Manhattan
+    distance scaled by the cheapest step cost as heuristic when there is a
+    grid to measure it on.
+    """
+    walls = getattr(problem, 'walls', None)
+    costFn = getattr(problem, 'costFn', None)
+    if walls is None or costFn is None or not hasattr(problem, 'getGoalState'):
+        return aStarSearch(problem)
+
+    costs = set(costFn(cell) for cell in walls.asList(False))
+    if len(costs) > 1:
+        goal = problem.getGoalState()
+        minCost = max(min(costs), 0)
+        return aStarSearch(problem, lambda state, problem=None: minCost * util.manhattanDistance(state, goal))
+
+    path = jumpPointPath(walls, problem.getStartState(), problem.getGoalState())
+    if hasattr(problem, '_expanded'):
+        problem._expanded += searchStatistics['expanded']
+    return path
 
 # Abbreviations
 bfs = breadthFirstSearch
 dfs = depthFirstSearch
 astar = aStarSearch
 ucs = uniformCostSearch
+bibfs = bidirectionalSearch
+biastar = bidirectionalAStarSearch
+jps = jumpPointSearch
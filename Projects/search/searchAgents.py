@@ -38,10 +38,12 @@ from typing import List, Tuple, Any
 from game import Directions
 from game import Agent
 from game import Actions
+from game import Grid
 import util
 import time
 import search
 import pacman
+import layout
 
 class GoWestAgent(Agent):
     "An agent that goes West until it can't."
@@ -71,11 +73,14 @@ class SearchAgent(Agent):
       depthFirstSearch or dfs
       breadthFirstSearch or bfs
 
+    Any other agent argument is passed on to the search function, e.g.
+    -a fn=astar,heuristic=manhattanHeuristic,tieBreak=fifo
+
 
     Note: You should NOT change any code in SearchAgent
     """
 
-    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic'):
+    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic', **searchArgs):
         # Warning: some advanced Python magic is employed below to find the right functions and problems
 
         # Get the search function from the name and heuristic
@@ -84,7 +89,7 @@ class SearchAgent(Agent):
         func = getattr(search, fn)
         if 'heuristic' not in func.__code__.co_varnames:
             print('[SearchAgent] using function ' + fn)
-            self.searchFunction = func
+            self.searchFunction = lambda x: func(x, **searchArgs)
         else:
             if heuristic in globals().keys():
                 heur = globals()[heuristic]
@@ -94,7 +99,7 @@ class SearchAgent(Agent):
                 raise AttributeError(heuristic + ' is not a function in searchAgents.py or search.py.')
             print('[SearchAgent] using function %s and heuristic %s' % (fn, heuristic))
             # Note: this bit of Python trickery combines the search algorithm and the heuristic
-            self.searchFunction = lambda x: func(x, heuristic=heur)
+            self.searchFunction = lambda x: func(x, heuristic=heur, **searchArgs)
 
         # Get the search problem type from the name
         if prob not in globals().keys() or not prob.endswith('Problem'):
@@ -117,6 +122,7 @@ class SearchAgent(Agent):
         self.actions  = self.searchFunction(problem) # Find a path
         if self.actions == None:
             self.actions = []
+        if 'expandActions' in dir(problem): self.actions = problem.expandActions(self.actions)
         totalCost = problem.getCostOfActions(self.actions)
         print('Path found with total cost of %d in %.1f seconds' % (totalCost, time.time() - starttime))
         if '_expanded' in dir(problem): print('Search nodes expanded: %d' % problem._expanded)
@@ -171,6 +177,9 @@ class PositionSearchProblem(search.SearchProblem):
     def getStartState(self):
         return self.startState
 
+    def getGoalState(self):
+        return self.goal
+
     def isGoalState(self, state):
         isGoal = state == self.goal
 
@@ -197,14 +206,9 @@ class PositionSearchProblem(search.SearchProblem):
         """
 
         successors = []
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x,y = state
-            dx, dy = Actions.directionToVector(action)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                nextState = (nextx, nexty)
-                cost = self.costFn(nextState)
-                successors.append( ( nextState, action, cost) )
+        for nextState, action in Actions.getMoveTable(self.walls).successors[state]:
+            cost = self.costFn(nextState)
+            successors.append( ( nextState, action, cost) )
 
         # Bookkeeping for display purposes
         self._expanded += 1 # DO NOT CHANGE
@@ -214,6 +218,24 @@ class PositionSearchProblem(search.SearchProblem):
 
         return successors
 
+    def getPredecessors(self, state):
+        """
+        The reverse successor function, used by bidirectional search.  Returns
+        (predecessor, action, stepCost) triples, where 'action' moves Pacman
+        from 'predecessor' into 'state' at a cost of 'stepCost'.
+        """
+
+        cost = self.costFn(state)
+        predecessors = [ (previousState, action, cost) for previousState, action in Actions.getMoveTable(self.walls).predecessors[state] ]
+
+        # Bookkeeping for display purposes
+        self._expanded += 1 # DO NOT CHANGE
+        if state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+
+        return predecessors
+
     def getCostOfActions(self, actions):
         """
         Returns the cost of a particular sequence of actions. If those actions
@@ -230,6 +252,111 @@ class PositionSearchProblem(search.SearchProblem):
             cost += self.costFn((x,y))
         return cost
 
+class JunctionGraph:
+    """
+    The maze of a walls Grid with its corridors contracted.
+
+    Open cells with exactly two open neighbours are corridor cells; every
+    other open cell (junctions, dead ends) and every cell in 'keep' is a
+    node.  Each walk from a node along a corridor to the next node becomes
+    one edge, stored as (nextNode, actions, cells): the per-step Directions
+    taken and the cells entered on the way.  Corridors leading back to the
+    node they started from are dropped, since they never shorten a path.
+    """
+
+    def __init__(self, walls, keep=()):
+        self.walls = walls
+        self.nodes = set(keep)
+        directions = [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]
+        vectors = [Actions.directionToVector(d) for d in directions]
+        for x in range(walls.width):
+            for y in range(walls.height):
+                if walls[x][y]:
+                    continue
+                degree = sum(1 for dx, dy in vectors if not walls[int(x + dx)][int(y + dy)])
+                if degree != 2:
+                    self.nodes.add((x, y))
+
+        self.edges = {}
+        for node in self.nodes:
+            edges = self.edges[node] = []
+            for action, (dx, dy) in zip(directions, vectors):
+                cell = (int(node[0] + dx), int(node[1] + dy))
+                if walls[cell[0]][cell[1]]:
+                    continue
+                actions, cells, previous = [action], [cell], node
+                while cell not in self.nodes:
+                    # A corridor cell: carry on through its other open side
+                    for nextAction, (ndx, ndy) in zip(directions, vectors):
+                        nextCell = (int(cell[0] + ndx), int(cell[1] + ndy))
+                        if nextCell != previous and not walls[nextCell[0]][nextCell[1]]:
+                            break
+                    previous, cell = cell, nextCell
+                    actions.append(nextAction)
+                    cells.append(cell)
+                if cell != node:
+                    edges.append((cell, tuple(actions), tuple(cells)))
+
+class CorridorSearchProblem(PositionSearchProblem):
+    """
+    A PositionSearchProblem searched on the JunctionGraph of the maze: states
+    are the graph's nodes (with the start and goal always among them), each
+    action is a whole corridor, given as a tuple of Directions, and its cost
+    is the sum of costFn over the cells entered along it.  Shortest paths
+    between nodes always run through whole corridors, so UCS and A* still
+    return optimal paths while only expanding junctions.
+
+    expandActions turns a solution back into per-step Directions; SearchAgent
+    does this automatically.
+
+    > python pacman.py -l bigMaze -p SearchAgent -a fn=ucs,prob=CorridorSearchProblem
+    """
+
+    def __init__(self, gameState, costFn = lambda x: 1, goal=(1,1), start=None, warn=True, visualize=True):
+        PositionSearchProblem.__init__(self, gameState, costFn, goal, start, warn, visualize)
+        self.graph = JunctionGraph(self.walls, keep=(self.startState, self.goal))
+        self.corridors = {}
+        for node, edges in self.graph.edges.items():
+            self.corridors[node] = [(nextNode, actions, sum(costFn(cell) for cell in cells))
+                                    for nextNode, actions, cells in edges]
+
+    def getSuccessors(self, state):
+        """
+        Returns (nextJunction, corridorActions, corridorCost) triples.
+        """
+
+        # Bookkeeping for display purposes
+        self._expanded += 1 # DO NOT CHANGE
+        if state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+
+        return list(self.corridors[state])
+
+    def getPredecessors(self, state):
+        """
+        Corridors are reversible: the predecessors of a junction are its
+        neighbours, reached through the reversed corridor.  The cost of a
+        corridor entered backwards counts the cells entered in that
+        direction.
+        """
+        predecessors = []
+        for nextNode, actions, cost in self.corridors[state]:
+            for previousNode, backActions, backCost in self.corridors[nextNode]:
+                if previousNode == state and backActions == tuple(Actions.reverseDirection(a) for a in reversed(actions)):
+                    predecessors.append((nextNode, backActions, backCost))
+                    break
+
+        self._expanded += 1 # DO NOT CHANGE
+        return predecessors
+
+    def expandActions(self, actions):
+        "Turns a list of corridor actions into the list of per-step Directions"
+        steps = []
+        for corridor in actions:
+            steps.extend(corridor)
+        return steps
+
 class StayEastSearchAgent(SearchAgent):
     """
     An agent for position search with a cost function that penalizes being in
@@ -373,6 +500,109 @@ class AStarCornersAgent(SearchAgent):
         self.searchFunction = lambda prob: search.aStarSearch(prob, cornersHeuristic)
         self.searchType = CornersProblem
 
+class FoodBitmask:
+    """
+    The food left in a FoodSearchProblem state, as an immutable bitmask.
+
+    The pellets present at the start of the search are numbered once, in
+    Grid.asList() order, and bit i of an int is set while pellet i is left.
+    Eating a pellet, hashing and comparing are single integer operations, so
+    successors no longer copy a whole Grid and states no longer hash one
+    cell by cell.
+
+    Heuristics can still read it like the food Grid: food[x][y], asList(),
+    count(), width and height work as before, and asGrid() builds a real
+    Grid.  Unlike a Grid, it cannot be modified in place; eat() returns the
+    bitmask without the given pellet.
+    """
+    __slots__ = ('index', 'bits')
+
+    class Index:
+        "The pellet numbering shared by all the bitmasks of one search"
+        def __init__(self, grid):
+            self.width, self.height = grid.width, grid.height
+            self.positions = grid.asList()
+            self.bits = dict((position, 1 << i) for i, position in enumerate(self.positions))
+
+    def __init__(self, index, bits):
+        self.index = index
+        self.bits = bits
+
+    def fromGrid(grid):
+        "Returns the bitmask with the food of a Grid"
+        index = FoodBitmask.Index(grid)
+        return FoodBitmask(index, (1 << len(index.positions)) - 1)
+    fromGrid = staticmethod(fromGrid)
+
+    def eat(self, position):
+        "Returns the food left after eating the pellet at position, if any"
+        bit = self.index.bits.get(position, 0)
+        if self.bits & bit:
+            return FoodBitmask(self.index, self.bits & ~bit)
+        return self
+
+    def isEmpty(self):
+        return self.bits == 0
+
+    def __eq__(self, other):
+        if not isinstance(other, FoodBitmask):
+            return False
+        # Bitmasks of different numberings are never equal, so that equal
+        # bitmasks have equal bits and hashes
+        if self.index is other.index:
+            return self.bits == other.bits
+        return self.bits == other.bits and self.index.positions == other.index.positions
+
+    def __hash__(self):
+        return hash(self.bits)
+
+    @property
+    def width(self):
+        return self.index.width
+
+    @property
+    def height(self):
+        return self.index.height
+
+    def hasFood(self, x, y):
+        return bool(self.bits & self.index.bits.get((x, y), 0))
+
+    def __getitem__(self, x):
+        return FoodBitmask.Column(self, x)
+
+    class Column:
+        "A read-only column, so that food[x][y] works as for a Grid"
+        __slots__ = ('food', 'x')
+
+        def __init__(self, food, x):
+            self.food, self.x = food, x
+
+        def __getitem__(self, y):
+            return self.food.hasFood(self.x, y)
+
+    def count(self, item=True):
+        left = bin(self.bits).count('1')
+        return left if item else self.width * self.height - left
+
+    def asList(self, key=True):
+        if not key:
+            return self.asGrid().asList(False)
+        positions, bits, food = self.index.positions, self.bits, []
+        while bits:
+            lowest = bits & -bits
+            food.append(positions[lowest.bit_length() - 1])
+            bits ^= lowest
+        return food
+
+    def asGrid(self):
+        grid = Grid(self.width, self.height)
+        for x, y in self.asList():
+            grid[x][y] = True
+        return grid
+
+    def __str__(self):
+        return str(self.asGrid())
+
 class FoodSearchProblem:
     """
     A search problem associated with finding the a path that collects all of the
@@ -380,10 +610,11 @@ class FoodSearchProblem:
 
     A search state in this problem is a tuple ( pacmanPosition, foodGrid ) where
       pacmanPosition: a tuple (x,y) of integers specifying Pacman's position
-      foodGrid:       a Grid (see game.py) of either True or False, specifying remaining food
+      foodGrid:       a FoodBitmask specifying remaining food, which reads
+                      like a Grid (see game.py) of either True or False
     """
     def __init__(self, startingGameState: pacman.GameState):
-        self.start = (startingGameState.getPacmanPosition(), startingGameState.getFood())
+        self.start = (startingGameState.getPacmanPosition(), FoodBitmask.fromGrid(startingGameState.getFood()))
         self.walls = startingGameState.getWalls()
         self.startingGameState = startingGameState
         self._expanded = 0 # DO NOT CHANGE
@@ -393,20 +624,15 @@ class FoodSearchProblem:
         return self.start
 
     def isGoalState(self, state):
-        return state[1].count() == 0
+        return state[1].isEmpty()
 
     def getSuccessors(self, state):
         "Returns successor states, the actions they require, and a cost of 1."
         successors = []
         self._expanded += 1 # DO NOT CHANGE
-        for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x,y = state[0]
-            dx, dy = Actions.directionToVector(direction)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                nextFood = state[1].copy()
-                nextFood[nextx][nexty] = False
-                successors.append( ( ((nextx, nexty), nextFood), direction, 1) )
+        for nextPosition, direction in Actions.getMoveTable(self.walls).successors[state[0]]:
+            nextFood = state[1].eat(nextPosition)
+            successors.append( ( (nextPosition, nextFood), direction, 1) )
         return successors
 
     def getCostOfActions(self, actions):
@@ -437,9 +663,9 @@ def foodHeuristic(state: Tuple[Tuple, List[List]], problem: FoodSearchProblem):
     your search may have a but our your heuristic is not admissible!  On the
     other hand, inadmissible heuristics may find optimal solutions, so be careful.
 
-    The state is a tuple ( pacmanPosition, foodGrid ) where foodGrid is a Grid
-    (see game.py) of either True or False. You can call foodGrid.asList() to get
-    a list of food coordinates instead.
+    The state is a tuple ( pacmanPosition, foodGrid ) where foodGrid is a
+    FoodBitmask, which reads like a Grid (see game.py) of either True or False.
+    You can call foodGrid.asList() to get a list of food coordinates instead.
 
     If you want access to info like walls, capsules, etc., you can query the
     problem.  For example, problem.walls gives you a Grid of where the walls
@@ -528,9 +754,13 @@ class AnyFoodSearchProblem(PositionSearchProblem):
 
 def mazeDistance(point1: Tuple[int, int], point2: Tuple[int, int], gameState: pacman.GameState) -> int:
     """
-    Returns the maze distance between any two points, using the search functions
-    you have already built. The gameState can be any game state -- Pacman's
-    position in that state is ignored.
+    Returns the maze distance between any two points, looked up in the
+    layout's all-pairs DistanceOracle (layout.py), which is built on the
+    first call and cached on disk. The gameState can be any game state --
+    Pacman's position in that state is ignored.
+
+    Points with no path between them, such as the separate regions of
+    smallSafeSearch, are 0 apart, as they were when this ran a search.
 
     Example usage: mazeDistance( (2,4), (5,6), gameState)
 
@@ -538,8 +768,10 @@ def mazeDistance(point1: Tuple[int, int], point2: Tuple[int, int], gameState: pa
     """
     x1, y1 = point1
     x2, y2 = point2
-    walls = gameState.getWalls()
+    walls = gameState.data.layout.walls
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
-    prob = PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
-    return len(search.bfs(prob))
+    distance = gameState.data.layout.getDistanceOracle().getDistance(point1, point2)
+    if distance == layout.DistanceOracle.UNREACHABLE:
+        return 0
+    return distance
@@ -29,6 +29,7 @@
 import sys
 import inspect
 import heapq, random
+import collections
 
 
 class FixedRandom:
@@ -222,6 +223,288 @@ class PriorityQueueWithFunction(PriorityQueue):
         PriorityQueue.push(self, item, self.priorityFunction(item))
 
 
+class IndexedPriorityQueue:
+    """
+      A priority queue that keeps a handle map from each item to the slot of
+      its entry in the heap, so that the priority of a queued item can be
+      lowered in O(log n) instead of scanning and re-heapifying the whole
+      heap as PriorityQueue.update does.
+
+      It has the same push/pop/isEmpty/update interface as PriorityQueue and
+      can be used in its place, with one difference: items must be hashable
+      and each item is queued at most once.  Pushing an item that is already
+      queued keeps the lower of its two priorities, which is what a graph
+      search wants anyway.  Ties are broken first-in-first-out, where a
+      decrease-key counts as a fresh insertion.
+    """
+    def  __init__(self):
+        self.heap = []      # entries are (priority, count, item)
+        self.index = {}     # item -> position of its entry in self.heap
+        self.count = 0
+
+    def push(self, item, priority):
+        if item in self.index:
+            self.decreaseKey(item, priority)
+            return
+        self.heap.append((priority, self.count, item))
+        self.count += 1
+        self.index[item] = len(self.heap) - 1
+        self._siftUp(len(self.heap) - 1)
+
+    def pop(self):
+        heap = self.heap
+        last = heap.pop()
+        if not heap:
+            del self.index[last[2]]
+            return last[2]
+        (_, _, item) = heap[0]
+        heap[0] = last
+        self.index[last[2]] = 0
+        del self.index[item]
+        self._siftDown(0)
+        return item
+
+    def isEmpty(self):
+        return len(self.heap) == 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return item in self.index
+
+    def getPriority(self, item):
+        "Returns the priority of a queued item"
+        return self.heap[self.index[item]][0]
+
+    def decreaseKey(self, item, priority):
+        """
+        Lowers the priority of a queued item.  Returns False, leaving the
+        queue unchanged, if the item is already queued with an equal or
+        lower priority.
+        """
+        pos = self.index[item]
+        if self.heap[pos][0] <= priority:
+            return False
+        self.heap[pos] = (priority, self.count, item)
+        self.count += 1
+        self._siftUp(pos)
+        return True
+
+    def update(self, item, priority):
+        # Same contract as PriorityQueue.update, in O(log n).
+        if item in self.index:
+            self.decreaseKey(item, priority)
+        else:
+            self.push(item, priority)
+
+    def _siftUp(self, pos):
+        heap, index = self.heap, self.index
+        entry = heap[pos]
+        while pos > 0:
+            parentPos = (pos - 1) >> 1
+            parent = heap[parentPos]
+            if entry < parent:
+                heap[pos] = parent
+                index[parent[2]] = pos
+                pos = parentPos
+            else:
+                break
+        heap[pos] = entry
+        index[entry[2]] = pos
+
+    def _siftDown(self, pos):
+        heap, index = self.heap, self.index
+        size = len(heap)
+        entry = heap[pos]
+        while True:
+            childPos = 2 * pos + 1
+            if childPos >= size:
+                break
+            rightPos = childPos + 1
+            if rightPos < size and heap[rightPos] < heap[childPos]:
+                childPos = rightPos
+            child = heap[childPos]
+            if child < entry:
+                heap[pos] = child
+                index[child[2]] = pos
+                pos = childPos
+            else:
+                break
+        heap[pos] = entry
+        index[entry[2]] = pos
+
+class IndexedPriorityQueueWithFunction(IndexedPriorityQueue):
+    """
+    The IndexedPriorityQueue counterpart of PriorityQueueWithFunction: push
+    takes only the item and the priority comes from the priority function.
+    """
+    def  __init__(self, priorityFunction):
+        "priorityFunction (item) -> priority"
+        self.priorityFunction = priorityFunction
+        IndexedPriorityQueue.__init__(self)
+
+    def push(self, item):
+        "Adds an item to the queue with priority from the priority function"
+        IndexedPriorityQueue.push(self, item, self.priorityFunction(item))
+
+
+class BucketPriorityQueue:
+    """
+      A bucket (Dial) priority queue for small integer priorities, such as
+      the path costs of searches with unit or small integer step costs.
+      Items are kept in one FIFO bucket per priority and pop scans upwards
+      from the lowest live bucket, so push is O(1) and pop is amortized O(1)
+      as long as priorities rarely go down.
+
+      A priority may also be a pair of integers (key, tie), ordered like a
+      tuple: each key bucket is then split into one FIFO slot per tie value.
+      A* uses this to break ties between equal f values on g.
+
+      It offers the same interface as IndexedPriorityQueue (and orders items
+      the same way).  The first time it is given a priority that is not an
+      integer, or that lies more than MAX_SPAN away from the queued ones, it
+      moves its contents into an IndexedPriorityQueue and behaves like one
+      from then on.  Fractional costs (e.g. those of StayEastSearchAgent) and
+      huge integer costs therefore stay correct.
+    """
+    MAX_SPAN = 1 << 12
+
+    def  __init__(self):
+        self.buckets = {}       # key -> [lowest tie, live entries, {tie: deque of (count, item)}]
+        self.entries = {}       # item -> (priority, count) of its live entry
+        self.current = 0        # no live entry has a lower key
+        self.count = 0
+        self.heap = None        # the IndexedPriorityQueue after falling back
+
+    def push(self, item, priority):
+        if self.heap is not None:
+            self.heap.push(item, priority)
+        elif item in self.entries:
+            self.decreaseKey(item, priority)
+        else:
+            self._insert(item, priority)
+
+    def pop(self):
+        if self.heap is not None:
+            return self.heap.pop()
+        buckets, entries = self.buckets, self.entries
+        if not entries:
+            raise IndexError('pop from an empty priority queue')
+        key = self.current
+        while True:
+            bucket = buckets.get(key)
+            if bucket is not None and bucket[1]:
+                slots = bucket[2]
+                tie = bucket[0]
+                while True:
+                    slot = slots.get(tie)
+                    while slot:
+                        count, item = slot.popleft()
+                        # Entries superseded by a decrease-key are skipped here.
+                        entry = entries.get(item)
+                        if entry is not None and entry[1] == count:
+                            del entries[item]
+                            bucket[0] = tie
+                            bucket[1] -= 1
+                            self.current = key
+                            return item
+                    if slot is not None:
+                        del slots[tie]
+                    tie += 1
+            if bucket is not None:
+                del buckets[key]
+            key += 1
+
+    def isEmpty(self):
+        return len(self) == 0
+
+    def __len__(self):
+        if self.heap is not None:
+            return len(self.heap)
+        return len(self.entries)
+
+    def __contains__(self, item):
+        if self.heap is not None:
+            return item in self.heap
+        return item in self.entries
+
+    def getPriority(self, item):
+        "Returns the priority of a queued item"
+        if self.heap is not None:
+            return self.heap.getPriority(item)
+        return self.entries[item][0]
+
+    def decreaseKey(self, item, priority):
+        """
+        Lowers the priority of a queued item.  Returns False, leaving the
+        queue unchanged, if the item is already queued with an equal or
+        lower priority.
+        """
+        if self.heap is not None:
+            return self.heap.decreaseKey(item, priority)
+        if self.entries[item][0] <= priority:
+            return False
+        self._insert(item, priority)
+        return True
+
+    def update(self, item, priority):
+        if self.heap is not None:
+            self.heap.update(item, priority)
+        elif item in self.entries:
+            self.decreaseKey(item, priority)
+        else:
+            self.push(item, priority)
+
+    def _insert(self, item, priority):
+        if type(priority) is tuple:
+            key, tie = priority
+        else:
+            key, tie = priority, 0
+        try:
+            integral = int(key) == key and int(tie) == tie
+        except (OverflowError, ValueError):
+            integral = False
+        if integral:
+            key, tie = int(key), int(tie)
+            bucket = self.buckets.get(key)
+        if (not integral or (self.entries and abs(key - self.current) > self.MAX_SPAN)
+                or (bucket is not None and bucket[1] and abs(tie - bucket[0]) > self.MAX_SPAN)):
+            self._fallBack()
+            self.heap.update(item, priority)
+            return
+
+        entries = self.entries
+        if item in entries:
+            # The old entry becomes stale; it is dropped when reached.
+            oldKey = entries[item][0]
+            oldKey = int(oldKey[0] if type(oldKey) is tuple else oldKey)
+            self.buckets[oldKey][1] -= 1
+        if not entries or key < self.current:
+            self.current = key
+        if bucket is None:
+            bucket = self.buckets[key] = [tie, 0, {}]
+        elif not bucket[1] or tie < bucket[0]:
+            bucket[0] = tie
+        bucket[1] += 1
+        slot = bucket[2].get(tie)
+        if slot is None:
+            slot = bucket[2][tie] = collections.deque()
+        slot.append((self.count, item))
+        entries[item] = (priority, self.count)
+        self.count += 1
+
+    def _fallBack(self):
+        "Moves the live entries into an IndexedPriorityQueue, keeping their order"
+        heap = IndexedPriorityQueue()
+        heap.heap = [(priority, count, item) for item, (priority, count) in self.entries.items()]
+        heapq.heapify(heap.heap)
+        heap.index = dict((entry[2], pos) for pos, entry in enumerate(heap.heap))
+        heap.count = self.count
+        self.heap = heap
+        self.buckets = self.entries = None
+
+
 def manhattanDistance( xy1, xy2 ):
     "Returns the Manhattan distance between points xy1 and xy2"
     return abs( xy1[0] - xy2[0] ) + abs( xy1[1] - xy2[1] )